@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def throttle_store(tmp_path_factory):
+    from django.test import override_settings
+
+    from api import throttling
+
+    # Общий файл THROTTLE_STORE остаётся за пределами дерева проекта.
+    path = tmp_path_factory.mktemp('throttle') / 'throttle.sqlite3'
+    with override_settings(THROTTLE_STORE={
+        'BACKEND': 'api.throttling.SQLiteThrottleStore',
+        'OPTIONS': {'path': path},
+    }):
+        throttling._throttle_store = None
+        yield
+    throttling._throttle_store = None
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import cache
+
+    from api import graph
+    from api.cache import get_object_cache
+    from api.throttling import get_throttle_store
+
+    cache.clear()
+    get_object_cache().clear()
+    get_throttle_store().clear()
+    graph._follow_graph = None
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.throttling import GCRAUserRateThrottle
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBatch:
+
+    url = '/api/v1/batch/'
+
+    def test_mixed_requests(self, user_client, user, post, group_1):
+        operations = [
+            {'method': 'GET', 'path': f'/api/v1/posts/{post.id}/'},
+            {'method': 'GET', 'path': '/api/v1/groups/?limit=1'},
+            {'method': 'POST', 'path': '/api/v1/posts/',
+             'body': {'text': 'Из пакета'}},
+            {'method': 'GET', 'path': '/api/v1/posts/?limit=1&offset=1'},
+            {'method': 'DELETE', 'path': f'/api/v1/posts/{post.id}/'},
+            {'method': 'GET', 'path': '/api/v1/nope/'},
+        ]
+        response = user_client.post(self.url, operations, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.url}` возвращает ответ '
+            'со статусом 200.'
+        )
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            200, 200, 201, 200, 204, 404
+        ], (
+            'Проверьте, что ответы подзапросов идут в порядке запросов '
+            'и содержат их статусы.'
+        )
+        assert results[0]['body']['text'] == post.text
+        assert results[1]['body']['results'][0]['slug'] == group_1.slug
+        created = results[2]['body']
+        assert created['author'] == user.username
+        assert results[3]['body']['results'][0]['id'] == created['id'], (
+            'Проверьте, что GET после записи в пакете видит её результат.'
+        )
+        assert not Post.objects.filter(id=post.id).exists()
+
+    def test_single_authentication(self, user_client, post, monkeypatch):
+        calls = []
+        authenticate = JWTAuthentication.authenticate
+
+        def counting(self, request):
+            calls.append(request)
+            return authenticate(self, request)
+
+        monkeypatch.setattr(JWTAuthentication, 'authenticate', counting)
+        operations = [
+            {'method': 'GET', 'path': f'/api/v1/posts/{post.id}/'}
+        ] * 3
+        response = user_client.post(self.url, operations, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert len(calls) == 1, (
+            'Проверьте, что пакет аутентифицируется один раз.'
+        )
+
+    def test_throttle_per_request(self, user_client, group_1, monkeypatch):
+        calls = []
+        allow_request = GCRAUserRateThrottle.allow_request
+
+        def counting(self, request, view):
+            calls.append(view)
+            return allow_request(self, request, view)
+
+        monkeypatch.setattr(GCRAUserRateThrottle, 'allow_request', counting)
+        operations = [
+            {'method': 'GET', 'path': f'/api/v1/groups/{group_1.id}/'}
+        ] * 3
+        user_client.post(self.url, operations, format='json')
+        assert len(calls) == 4, (
+            'Проверьте, что throttling учитывает каждый подзапрос пакета.'
+        )
+
+    def test_anonymous(self, client, post):
+        operations = [
+            {'method': 'GET', 'path': f'/api/v1/posts/{post.id}/'},
+            {'method': 'POST', 'path': '/api/v1/posts/',
+             'body': {'text': 'Аноним'}},
+        ]
+        response = client.post(
+            self.url, operations, content_type='application/json'
+        )
+        statuses = [result['status'] for result in response.json()['results']]
+        assert statuses == [200, 401], (
+            'Проверьте, что у подзапросов свои права доступа.'
+        )
+
+    @pytest.mark.parametrize('operations', (
+        [],
+        {'method': 'GET', 'path': '/api/v1/posts/'},
+        [{'method': 'HEAD', 'path': '/api/v1/posts/'}],
+        [{'method': 'GET', 'path': '/api/v1/posts/'}] * 21,
+    ))
+    def test_invalid_batch(self, user_client, operations):
+        response = user_client.post(self.url, operations, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пустой, слишком большой или некорректный '
+            'пакет возвращает ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('path', (
+        '/api/v1/batch/', '/api/v1/jwt/create/', '/admin/',
+    ))
+    def test_foreign_routes(self, user_client, path):
+        response = user_client.post(
+            self.url, [{'method': 'GET', 'path': path}], format='json'
+        )
+        assert response.json()['results'][0]['status'] == 404, (
+            'Проверьте, что в пакете доступны только маршруты постов, '
+            'комментариев, групп и подписок.'
+        )
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Change
+
+
+@pytest.mark.django_db(transaction=True)
+class TestChanges:
+
+    url = '/api/v1/changes/'
+
+    def get_changes(self, client, since, **params):
+        query = ''.join(f'&{key}={value}' for key, value in params.items())
+        response = client.get(f'{self.url}?since={since}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}?since=` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_changes_since_watermark(self, user_client, user, another_user):
+        watermark = user_client.get(self.url).json()['next']
+
+        post_id = user_client.post(
+            '/api/v1/posts/', {'text': 'Новый'}, format='json'
+        ).json()['id']
+        comments_url = f'/api/v1/posts/{post_id}/comments/'
+        comment_id = user_client.post(
+            comments_url, {'text': 'Комментарий'}, format='json'
+        ).json()['id']
+        user_client.patch(
+            f'{comments_url}{comment_id}/', {'text': 'Правка'}, format='json'
+        )
+        user_client.post(
+            '/api/v1/follow/', {'following': another_user.username},
+            format='json',
+        )
+
+        data = self.get_changes(user_client, watermark)
+        changes = [
+            (change['model'], change['id'], change['action'])
+            for change in data['changes']
+        ]
+        assert changes == [
+            ('post', post_id, 'created'),
+            ('comment', comment_id, 'created'),
+            ('post', post_id, 'updated'),
+            ('comment', comment_id, 'updated'),
+            ('follow', another_user.id, 'created'),
+        ], (
+            'Проверьте, что `/changes/` возвращает изменения постов, '
+            'комментариев и подписок после водяного знака по порядку.'
+        )
+        assert data['changes'][-1]['following'] == another_user.username
+        assert data['has_more'] is False
+
+        user_client.delete(f'/api/v1/posts/{post_id}/')
+        data = self.get_changes(user_client, data['next'])
+        assert [
+            (change['model'], change['id'], change['action'])
+            for change in data['changes']
+        ] == [
+            ('comment', comment_id, 'deleted'),
+            ('post', post_id, 'deleted'),
+        ], (
+            'Проверьте, что удаление поста оставляет записи `deleted` для '
+            'него и его комментариев.'
+        )
+        assert self.get_changes(user_client, data['next'])['changes'] == []
+
+    def test_limit_and_has_more(self, user_client):
+        for i in range(3):
+            user_client.post(
+                '/api/v1/posts/', {'text': f'Пост {i}'}, format='json'
+            )
+        data = self.get_changes(user_client, 0, limit=2)
+        assert len(data['changes']) == 2 and data['has_more'] is True, (
+            'Проверьте, что `limit` ограничивает ответ, а `has_more` '
+            'сообщает об оставшихся изменениях.'
+        )
+        data = self.get_changes(user_client, data['next'], limit=2)
+        assert len(data['changes']) == 1 and data['has_more'] is False
+
+    def test_follows_private(self, user_client, client, another_user):
+        user_client.post(
+            '/api/v1/follow/bulk/', {'following': [another_user.username]},
+            format='json',
+        )
+        assert Change.objects.filter(model=Change.FOLLOW).count() == 1
+        assert self.get_changes(client, 0)['changes'] == [], (
+            'Проверьте, что изменения подписок видны только их владельцу.'
+        )
+
+    @pytest.mark.parametrize('query', ('since=abc', 'since=-1',
+                                       'since=0&limit=0'))
+    def test_invalid_params(self, user_client, query):
+        response = user_client.get(f'{self.url}?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.url}?{query}` возвращает '
+            'ответ со статусом 400.'
+        )
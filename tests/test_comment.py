@@ -1,5 +1,7 @@
 from http import HTTPStatus
+from io import StringIO
 
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 import pytest
 
@@ -83,7 +85,8 @@ class TestCommentAPI:
     def test_comments_get(self, user_client, post, comment_1_post,
                           comment_2_post, comment_1_another_post):
         response = user_client.get(
-            self.comments_url.format(post_id=post.id)
+            self.comments_url.format(post_id=post.id),
+            HTTP_X_PAGINATION='none',
         )
         assert response.status_code == HTTPStatus.OK, (
             'Проверьте, что при GET-запросе авторизованного пользователя к '
@@ -369,3 +372,68 @@ class TestCommentAPI:
             'Проверьте, что для неавторизованного пользователя DELETE-запрос '
             f'к `{self.comment_detail_url}` не удаляет комментарий.'
         )
+
+    def test_comments_count(self, user_client, post):
+        post_url = f'/api/v1/posts/{post.id}/'
+        assert user_client.get(post_url).json()['comments_count'] == 0, (
+            f'Проверьте, что ответ на GET-запрос к `{post_url}` содержит '
+            'поле `comments_count`.'
+        )
+
+        response = user_client.post(
+            self.comments_url.format(post_id=post.id),
+            data={'text': self.TEXT_FOR_COMMENT}
+        )
+        comment_id = response.json()['id']
+        assert user_client.get(post_url).json()['comments_count'] == 1, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comments_count` поста.'
+        )
+
+        user_client.delete(self.comment_detail_url.format(
+            post_id=post.id, comment_id=comment_id
+        ))
+        assert user_client.get(post_url).json()['comments_count'] == 0, (
+            'Проверьте, что удаление комментария уменьшает '
+            '`comments_count` поста.'
+        )
+
+    def test_reconcile_comments_count(self, post, comment_1_post,
+                                      comment_2_post):
+        call_command('reconcile_comments_count', stdout=StringIO())
+        post.refresh_from_db()
+        assert post.comments_count == 2, (
+            'Проверьте, что команда `reconcile_comments_count` '
+            'исправляет расхождения счётчика комментариев.'
+        )
+
+    def test_comments_cursor_pagination(self, user_client, post, user,
+                                        settings):
+        comments = [
+            Comment.objects.create(author=user, post=post, text=str(i))
+            for i in range(5)
+        ]
+        url = self.comments_url.format(post_id=post.id)
+        response = user_client.get(f'{url}?limit=2')
+        test_data = response.json()
+        assert [item['id'] for item in test_data['results']] == [
+            comments[0].id, comments[1].id
+        ], (
+            f'Проверьте, что GET-запрос к `{url}` возвращает комментарии '
+            'страницами в порядке создания.'
+        )
+        response = user_client.get(test_data['next'])
+        assert [item['id'] for item in response.json()['results']] == [
+            comments[2].id, comments[3].id
+        ]
+
+        response = user_client.get(f'{url}?limit=1000')
+        assert len(response.json()['results']) == 5
+
+        settings.API_UNPAGINATED_MAX_RESULTS = 3
+        response = user_client.get(url, HTTP_X_PAGINATION='none')
+        assert len(response.json()) == 3, (
+            'Проверьте, что ответ без пагинации ограничен '
+            '`API_UNPAGINATED_MAX_RESULTS` объектами.'
+        )
+        assert 'X-Pagination' in response['Vary']
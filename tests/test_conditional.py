@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=1',
+        '/api/v1/posts/?cursor=',
+        '/api/v1/posts/{post_id}/',
+        '/api/v1/posts/{post_id}/comments/',
+        '/api/v1/groups/',
+        '/api/v1/groups/{group_id}/',
+    ))
+    def test_not_modified(self, user_client, post, comment_1_post, url):
+        url = url.format(post_id=post.id, group_id=post.group_id)
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'ETag' in response, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+        is_detail = url.endswith(f'/{post.id}/') or url.endswith(
+            f'/{post.group_id}/'
+        )
+        assert ('Last-Modified' in response) == is_detail, (
+            'Проверьте, что `Last-Modified` есть только у ответа с '
+            'одним объектом.'
+        )
+
+        etag = response['ETag']
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+
+    def test_etag_changes(self, user_client, user, post, comment_1_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        etag = user_client.get(url)['ETag']
+
+        user.username = 'RenamedUser'
+        user.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения имени автора `ETag` '
+            f'ответа на GET-запрос к `{url}` меняется.'
+        )
+        etag = response['ETag']
+
+        comment_1_post.delete()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления комментария `ETag` ответа '
+            f'на GET-запрос к `{url}` меняется.'
+        )
+        assert response.json()['results'] == []
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/posts/', '/api/v1/posts/?limit=2',
+    ))
+    def test_list_after_delete(self, user_client, post, another_post, url):
+        user_client.get(url)
+        another_post.delete()
+        response = user_client.get(
+            url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после удаления поста GET-запрос к `{url}` '
+            'с `If-Modified-Since` возвращает новые данные.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/posts/?limit=1', '/api/v1/posts/?cursor=&limit=1',
+    ))
+    def test_page_etag_changes(self, user_client, post, another_post, url):
+        etag = user_client.get(url)['ETag']
+        # Следующий пост не входит в страницу, но меняет count или
+        # ссылку next.
+        next_post = another_post if url.endswith('?limit=1') else post
+        next_post.delete()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `ETag` страницы `{url}` меняется вместе с '
+            'данными пагинации.'
+        )
+        etag = response['ETag']
+
+        post_on_page = another_post if next_post is post else post
+        post_on_page.text = 'Изменён'
+        post_on_page.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `ETag` страницы `{url}` меняется при '
+            'изменении поста на ней.'
+        )
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExpandComments:
+
+    url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def posts(self, user, another_user):
+        posts = [
+            Post.objects.create(author=user, text=f'Пост {i}')
+            for i in range(6)
+        ]
+        for post in posts:
+            for i in range(5):
+                Comment.objects.create(
+                    author=another_user, post=post, text=f'{post.id}-{i}'
+                )
+        return posts
+
+    def test_latest_comments_embedded(self, user_client, posts):
+        url = f'{self.url}{posts[0].id}/?expand=comments&comments_limit=2'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        comments = response.json()['comments']
+        expected = user_client.get(
+            f'{self.url}{posts[0].id}/comments/?limit=5'
+        ).json()['results'][-2:]
+        assert comments == expected, (
+            f'Проверьте, что GET-запрос к `{url}` встраивает последние '
+            '`comments_limit` комментариев в том же виде, что и '
+            'эндпоинт комментариев.'
+        )
+
+        response = user_client.get(f'{self.url}?expand=comments')
+        assert all(
+            len(post['comments']) == 3 for post in response.json()
+        ), 'Проверьте, что по умолчанию встраиваются 3 комментария.'
+
+    def test_query_count_independent_of_page(self, user_client, posts,
+                                             django_assert_max_num_queries):
+        for limit in (1, 6):
+            url = f'{self.url}?expand=comments&limit={limit}'
+            # Пользователь, два агрегата для ETag, id постов, данные
+            # постов, count для пагинации и комментарии.
+            with django_assert_max_num_queries(7):
+                response = user_client.get(url)
+            assert len(response.json()['results']) == limit
+
+    def test_etag_follows_comments(self, user_client, posts):
+        url = f'{self.url}{posts[0].id}/?expand=comments'
+        etag = user_client.get(url)['ETag']
+        comment = Comment.objects.filter(post=posts[0]).last()
+        comment.text = 'Изменённый'
+        comment.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` с `expand=comments` меняется при '
+            'изменении комментария.'
+        )
+        assert response.json()['comments'][-1]['text'] == 'Изменённый'
+
+    @pytest.mark.parametrize('query', (
+        'expand=likes', 'expand=comments&comments_limit=0',
+        'expand=comments&comments_limit=abc', 'expand=comments&fields=text',
+    ))
+    def test_invalid_params(self, user_client, posts, query):
+        response = user_client.get(f'{self.url}?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.url}?{query}` возвращает '
+            'ответ со статусом 400.'
+        )
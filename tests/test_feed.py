@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from posts.models import FeedItem, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    url = '/api/v1/feed/'
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_feed_contains_followed_posts(self, user_client, post,
+                                          another_post, another_user):
+        response = user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        another_client = APIClient()
+        another_client.force_authenticate(another_user)
+        response = another_client.post(
+            '/api/v1/posts/', data={'text': 'Новый пост'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        new_post_id = response.json()['id']
+
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 200.'
+        )
+        received_ids = [
+            item['id'] for item in response.json()['results']
+        ]
+        assert received_ids == [new_post_id, another_post.id], (
+            f'Проверьте, что `{self.url}` возвращает посты авторов из '
+            'подписок пользователя, от новых к старым, и не содержит '
+            'чужих постов.'
+        )
+
+    def test_feed_trimmed(self, user_client, user, another_user,
+                          settings):
+        from posts import feed
+
+        settings.FEED_MAX_LENGTH = 2
+        for i in range(4):
+            Post.objects.create(text=f'Пост {i}', author=another_user)
+            feed.fan_out_post(Post.objects.latest('id'))
+        user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        Post.objects.create(text='Пост 5', author=another_user)
+        feed.fan_out_post(Post.objects.latest('id'))
+
+        assert FeedItem.objects.filter(user=user).count() == 2, (
+            'Проверьте, что лента пользователя обрезается до '
+            '`FEED_MAX_LENGTH` последних записей.'
+        )
+
+    def test_fanout_limit_crossed(self, user_client, user, user_2,
+                                  another_user, settings):
+        settings.FEED_FANOUT_LIMIT = 1
+        another_client = APIClient()
+        another_client.force_authenticate(another_user)
+        user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        before = another_client.post(
+            '/api/v1/posts/', data={'text': 'Один подписчик'}
+        ).json()['id']
+
+        user_2_client = APIClient()
+        user_2_client.force_authenticate(user_2)
+        user_2_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        during = another_client.post(
+            '/api/v1/posts/', data={'text': 'Два подписчика'}
+        ).json()['id']
+        assert not FeedItem.objects.filter(post_id=during).exists(), (
+            'Проверьте, что посты авторов с числом подписчиков больше '
+            '`FEED_FANOUT_LIMIT` не раскладываются по лентам.'
+        )
+
+        user_2_client.post(
+            '/api/v1/follow/bulk-delete/',
+            {'following': [another_user.username]}, format='json',
+        )
+        after = another_client.post(
+            '/api/v1/posts/', data={'text': 'Снова один'}
+        ).json()['id']
+        assert FeedItem.objects.filter(post_id=after).exists()
+        received_ids = [item['id'] for item in user_client.get(
+            self.url
+        ).json()['results']]
+        assert received_ids == [after, during, before], (
+            'Проверьте, что посты не пропадают из ленты, когда число '
+            'подписчиков автора переходит через `FEED_FANOUT_LIMIT`.'
+        )
+
+    def test_feed_pages(self, user_client, user_2, another_user):
+        for author in (another_user, user_2):
+            user_client.post(
+                '/api/v1/follow/', data={'following': author.username}
+            )
+        another_client = APIClient()
+        another_client.force_authenticate(another_user)
+        post_ids = []
+        for i in range(6):
+            post_ids.append(another_client.post(
+                '/api/v1/posts/', data={'text': f'В ленте {i}'}
+            ).json()['id'])
+            # Пост без fan_out_post: лента берёт его напрямую.
+            post_ids.append(Post.objects.create(
+                text=f'Напрямую {i}', author=user_2
+            ).id)
+        assert FeedItem.objects.count() == 6
+
+        response = user_client.get(self.url)
+        assert len(response.json()['results']) == 10, (
+            f'Проверьте, что `{self.url}` без `limit` отдаёт первую '
+            'страницу ленты.'
+        )
+        received_ids = []
+        url = f'{self.url}?limit=5'
+        while url:
+            data = user_client.get(url).json()
+            received_ids += [item['id'] for item in data['results']]
+            url = data['next']
+        assert received_ids == post_ids[::-1], (
+            'Проверьте, что страницы ленты объединяют разложенные и '
+            'неразложенные посты без пропусков и повторов.'
+        )
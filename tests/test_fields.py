@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSparseFieldsets:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        post_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+            and 'MAX(' not in query['sql']
+        ]
+        return response.json(), post_queries
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_posts_list(self, user_client, post, another_post, settings,
+                        fast):
+        settings.API_FAST_READ_SERIALIZERS = fast
+        url = '/api/v1/posts/?fields=id,text'
+        data, queries = self.get(user_client, url)
+        assert [set(item) for item in data] == [{'id', 'text'}] * 2, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает только '
+            'запрошенные поля.'
+        )
+        assert queries and not any(
+            'auth_user' in sql or '"image"' in sql for sql in queries
+        ), (
+            'Проверьте, что при `?fields=` без `author` запрос к БД не '
+            'соединяет таблицу пользователей и не читает лишние колонки.'
+        )
+
+        data, _ = self.get(
+            user_client, '/api/v1/posts/?fields=author,id&cursor='
+        )
+        assert data['results'][0] == {
+            'author': another_post.author.username, 'id': another_post.id
+        }
+
+    @pytest.mark.parametrize('fast', (True, False))
+    def test_post_detail(self, user_client, post, settings, fast):
+        settings.API_FAST_READ_SERIALIZERS = fast
+        data, _ = self.get(
+            user_client, f'/api/v1/posts/{post.id}/?fields=author,text'
+        )
+        assert data == {'author': post.author.username, 'text': post.text}
+
+    def test_comments_and_groups(self, user_client, post, comment_1_post,
+                                 comment_2_post, group_1):
+        data, _ = self.get(
+            user_client,
+            f'/api/v1/posts/{post.id}/comments/?fields=text&limit=1',
+        )
+        assert data['results'] == [{'text': comment_1_post.text}]
+        data, _ = self.get(user_client, data['next'])
+        assert data['results'] == [{'text': comment_2_post.text}], (
+            'Проверьте, что курсорная пагинация комментариев работает '
+            'вместе с `?fields=`.'
+        )
+
+        data, _ = self.get(user_client, '/api/v1/groups/?fields=slug')
+        assert data['results'] == [{'slug': group_1.slug}]
+
+    def test_unknown_field(self, user_client, post):
+        response = user_client.get('/api/v1/posts/?fields=id,password')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запрос неизвестного поля в `?fields=` '
+            'возвращает ответ со статусом 400.'
+        )
@@ -1,6 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
 from django.db.utils import IntegrityError
+from django.test.utils import CaptureQueriesContext
 import pytest
 
 from posts.models import Follow
@@ -160,6 +162,38 @@ class TestFollowAPI:
             'со статусом 400.'
         )
 
+    def test_follow_create_errors(self, user_client, follow_1, another_user):
+        response = user_client.post(self.url, data={'following': 'nobody'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert response.json() == {'error': 'Пользователь не найден'}
+
+        response = user_client.post(
+            self.url, data={'following': another_user.username}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'error': 'Вы уже подписаны на этого пользователя'
+        }, (
+            'Проверьте, что повторная подписка через POST-запрос к '
+            f'`{self.url}` возвращает прежнее сообщение об ошибке.'
+        )
+        assert Follow.objects.count() == 1
+
+    @pytest.mark.parametrize('following', (
+        [], ['nobody'], {'username': 'nobody'}, 5,
+    ))
+    def test_follow_create_not_string(self, user_client, following):
+        response = user_client.post(
+            self.url, data={'following': following}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.url}`, где `following` '
+            'не строка, возвращает ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'error': 'Не указан пользователь для подписки'
+        }
+
     @pytest.mark.django_db(transaction=True)
     def test_follow_search_filter(self, user_client, follow_1, follow_2,
                                   follow_3, follow_4, follow_5,
@@ -190,3 +224,111 @@ class TestFollowAPI:
             f'GET-запрос с параметром `search` к `{self.url}` содержит только '
             'те подписки, которые удовлетворяют параметрам поиска.'
         )
+
+    def test_follow_search_prefix(self, user_client, user, follow_1,
+                                  follow_5, user_2, another_user,
+                                  django_user_model):
+        response = user_client.get(f'{self.url}?search=^testuser')
+        assert [item['following'] for item in response.json()] == [
+            user_2.username, another_user.username
+        ], (
+            f'Проверьте, что GET-запрос к `{self.url}` с `search=^...` '
+            'находит подписки по началу имени без учёта регистра.'
+        )
+
+        response = user_client.get(f'{self.url}?search=^testusera')
+        assert [item['following'] for item in response.json()] == [
+            another_user.username
+        ]
+        response = user_client.get(f'{self.url}?search=^another')
+        assert response.json() == [], (
+            'Проверьте, что `search=^...` не находит совпадения в середине '
+            'имени.'
+        )
+
+        response = user_client.get(f'{self.url}?search=another')
+        assert [item['following'] for item in response.json()] == [
+            another_user.username
+        ], (
+            f'Проверьте, что GET-запрос к `{self.url}` с параметром `search` '
+            'по-прежнему находит подстроку в имени.'
+        )
+
+        for username in ('LiZa', 'liza2', 'Zed', 'a_bob'):
+            Follow.objects.create(
+                user=user,
+                following=django_user_model.objects.create_user(
+                    username=username, password='1234567'
+                ),
+            )
+        for query, expected in (
+            ('^LIZ', ['LiZa', 'liza2']),
+            ('^liZ', ['LiZa', 'liza2']),
+            ('^Z', ['Zed']),
+            ('^a@', []),
+            ('^a_', ['a_bob']),
+        ):
+            response = user_client.get(f'{self.url}?search={query}')
+            assert sorted(
+                item['following'] for item in response.json()
+            ) == expected, (
+                f'Проверьте, что `search={query}` сравнивает начало имени '
+                'без учёта регистра и без лишних совпадений.'
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            user_client.get(f'{self.url}?search=^liz')
+        sql = next(
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_follow"' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'auth_user_username_nocase' in plan, (
+            'Проверьте, что поиск по началу имени использует индекс '
+            f'auth_user_username_nocase: {plan}'
+        )
+
+    def test_follow_bulk(self, user_client, user, user_2, another_user,
+                         follow_1, django_assert_max_num_queries):
+        url = f'{self.url}bulk/'
+        data = {'following': [
+            user_2.username, another_user.username, user.username, 'nobody'
+        ]}
+        with django_assert_max_num_queries(10):
+            response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json()['results'] == [
+            {'following': user_2.username, 'status': 'created'},
+            {'following': another_user.username,
+             'status': 'already_following'},
+            {'following': user.username, 'status': 'self'},
+            {'following': 'nobody', 'status': 'not_found'},
+        ], (
+            f'Проверьте, что POST-запрос к `{url}` возвращает результат '
+            'для каждого пользователя из списка.'
+        )
+        assert Follow.objects.filter(user=user).count() == 2
+
+        url = f'{self.url}bulk-delete/'
+        data = {'following': [user_2.username, 'nobody']}
+        response = user_client.post(url, data=data, format='json')
+        assert response.json()['results'] == [
+            {'following': user_2.username, 'status': 'deleted'},
+            {'following': 'nobody', 'status': 'not_found'},
+        ], (
+            f'Проверьте, что POST-запрос к `{url}` удаляет подписки и '
+            'возвращает результат для каждого пользователя.'
+        )
+        assert list(
+            Follow.objects.filter(user=user).values_list(
+                'following', flat=True
+            )
+        ) == [another_user.id]
+
+        response = user_client.post(url, data={}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
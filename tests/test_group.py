@@ -67,7 +67,7 @@ class TestGroupAPI:
         )
 
     def test_group_auth_get(self, user_client, group_1, group_2):
-        response = user_client.get(self.group_url)
+        response = user_client.get(self.group_url, HTTP_X_PAGINATION='none')
         assert response.status_code == HTTPStatus.OK, (
             'Проверьте, что для авторизованного пользователя GET-запрос к '
             f'{self.group_url}` возвращает ответ со статусом 200.'
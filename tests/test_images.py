@@ -0,0 +1,227 @@
+from http import HTTPStatus
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from posts.images import schedule_variants
+from posts.models import MediaBlob, Post
+from posts.storage import serve_media
+
+
+def make_image(size=(2000, 1500), image_format='JPEG', name='photo.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'orange').save(buffer, image_format)
+    return SimpleUploadedFile(
+        name, buffer.getvalue(), content_type=f'image/{image_format.lower()}'
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageVariants:
+
+    post_list_url = '/api/v1/posts/'
+
+    def test_variants_after_create(self, user_client, media_root):
+        response = user_client.post(
+            self.post_list_url,
+            data={'text': 'С картинкой', 'image': make_image()},
+            format='multipart',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+        post = Post.objects.get(pk=response.json()['id'])
+        assert set(post.image_variants) == {'thumbnail', 'large'}, (
+            'Проверьте, что после создания поста с изображением для него '
+            'создаются уменьшенные копии.'
+        )
+        with Image.open(media_root / post.image_variants['thumbnail']) as im:
+            assert im.format == 'WEBP' and max(im.size) == 320
+
+        response = user_client.get(f'{self.post_list_url}{post.id}/')
+        variants = response.json()['image_variants']
+        assert variants['thumbnail'].startswith('http://testserver/media/'), (
+            'Проверьте, что `PostSerializer` отдаёт абсолютные ссылки на '
+            'уменьшенные копии изображения.'
+        )
+
+    def test_backfill_command(self, user, media_root, settings):
+        post = Post.objects.create(
+            author=user, text='Старый пост', image=make_image((800, 600))
+        )
+        assert post.image_variants == {}
+
+        settings.POST_IMAGE_WORKERS = 1
+        call_command('generate_image_variants', stdout=StringIO())
+        post.refresh_from_db()
+        assert set(post.image_variants) == {'thumbnail', 'large'}, (
+            'Проверьте, что команда `generate_image_variants` создаёт копии '
+            'для уже опубликованных постов.'
+        )
+        with Image.open(media_root / post.image_variants['large']) as im:
+            assert im.size == (800, 600), (
+                'Проверьте, что изображение не увеличивается сверх '
+                'исходного размера.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageUpload:
+
+    post_list_url = '/api/v1/posts/'
+
+    def upload(self, client, image):
+        return client.post(
+            self.post_list_url,
+            data={'text': 'С картинкой', 'image': image},
+            format='multipart',
+        )
+
+    def test_dimensions_stored(self, user_client, media_root):
+        response = self.upload(user_client, make_image((640, 480)))
+        assert response.status_code == HTTPStatus.CREATED
+        test_data = response.json()
+        assert (test_data['image_width'], test_data['image_height']) == (
+            640, 480
+        ), (
+            'Проверьте, что размеры изображения сохраняются при загрузке и '
+            'возвращаются в ответе.'
+        )
+        post = Post.objects.get(pk=test_data['id'])
+        assert (post.image_width, post.image_height) == (640, 480)
+
+    def test_too_large_rejected(self, user_client, media_root, settings):
+        settings.IMAGE_UPLOAD = {'MAX_SIZE': 1024}
+        response = self.upload(user_client, make_image((640, 480)))
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+            'Проверьте, что загрузка файла больше `IMAGE_UPLOAD.MAX_SIZE` '
+            'отклоняется со статусом 413.'
+        )
+        assert not Post.objects.exists()
+
+    def test_invalid_images_rejected(self, user_client, media_root,
+                                     settings):
+        settings.IMAGE_UPLOAD = {'MAX_PIXELS': 10000}
+        response = self.upload(user_client, make_image((200, 200)))
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображение с числом пикселей больше '
+            '`IMAGE_UPLOAD.MAX_PIXELS` отклоняется.'
+        )
+
+        response = self.upload(user_client, make_image(
+            (50, 50), image_format='BMP', name='photo.bmp'
+        ))
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что изображения неподдерживаемых форматов '
+            'отклоняются.'
+        )
+
+        response = self.upload(user_client, SimpleUploadedFile(
+            'photo.jpg', b'not an image', content_type='image/jpeg'
+        ))
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Post.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContentAddressedStorage:
+
+    def create_post(self, user, image):
+        return Post.objects.create(author=user, text='Мем', image=image)
+
+    def test_same_content_stored_once(self, user, another_user, media_root,
+                                      monkeypatch):
+        first = self.create_post(user, make_image((400, 300)))
+        schedule_variants(first)
+        second = self.create_post(
+            another_user, make_image((400, 300), name='copy.jpg')
+        )
+        assert first.image.name == second.image.name, (
+            'Проверьте, что одинаковые файлы сохраняются под одним именем.'
+        )
+        assert len(list(media_root.glob('posts/*/*.jpg'))) == 1
+
+        def fail(*args):
+            raise AssertionError('Копии уже есть у первого поста.')
+
+        monkeypatch.setattr('posts.images.render_variants', fail)
+        schedule_variants(second)
+        second.refresh_from_db()
+        assert second.image_variants == Post.objects.get(
+            pk=first.pk
+        ).image_variants, (
+            'Проверьте, что для уже обработанного файла копии не создаются '
+            'повторно.'
+        )
+
+        image_path = media_root / first.image.name
+        first.delete()
+        assert image_path.exists(), (
+            'Проверьте, что файл не удаляется, пока на него ссылается '
+            'другой пост.'
+        )
+        second.delete()
+        assert not image_path.exists(), (
+            'Проверьте, что файл удаляется вместе с последним постом.'
+        )
+        assert not list(media_root.glob('posts/*/variants/*'))
+        assert not MediaBlob.objects.exists()
+
+    def test_delete_between_dedup_and_acquire(self, user, another_user,
+                                             media_root, monkeypatch):
+        first = self.create_post(user, make_image((400, 300)))
+        image_path = media_root / first.image.name
+        storage = Post._meta.get_field('image').storage
+        save = type(storage)._save
+
+        def save_then_delete_first(self, name, content):
+            # Файл уже есть и не пишется, а последний ссылавшийся на
+            # него пост удаляется до того, как второй пост возьмёт ссылку.
+            name = save(self, name, content)
+            monkeypatch.setattr(type(storage), '_save', save)
+            first.delete()
+            return name
+
+        monkeypatch.setattr(type(storage), '_save', save_then_delete_first)
+        second = self.create_post(
+            another_user, make_image((400, 300), name='copy.jpg')
+        )
+        assert second.image.name == image_path.relative_to(
+            media_root
+        ).as_posix()
+        assert image_path.exists(), (
+            'Проверьте, что файл, удалённый между проверкой дубликата и '
+            'взятием ссылки, записывается снова.'
+        )
+        assert MediaBlob.objects.get(name=second.image.name).refcount == 1
+
+    def test_replace_image_releases_old(self, user, media_root):
+        post = self.create_post(user, make_image((400, 300)))
+        old_path = media_root / post.image.name
+        post.image = make_image((300, 400))
+        post.save()
+        assert not old_path.exists()
+        assert MediaBlob.objects.get(name=post.image.name).refcount == 1
+
+    def test_immutable_cache_headers(self, user, media_root):
+        post = self.create_post(user, make_image((40, 30)))
+        request = RequestFactory().get(f'/media/{post.image.name}')
+        response = serve_media(
+            request, post.image.name, document_root=media_root
+        )
+        assert response['Cache-Control'] == (
+            'public, max-age=31536000, immutable'
+        ), (
+            'Проверьте, что файлы с именем-хешем отдаются с заголовком '
+            '`Cache-Control: immutable`.'
+        )
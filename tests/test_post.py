@@ -127,6 +127,80 @@ class TestPostAPI:
             db_post=db_post
         )
 
+    @pytest.mark.usefixtures('post', 'post_2', 'another_post')
+    def test_posts_get_cursor_paginated(self, user_client):
+        url = f'{self.post_list_url}?cursor=&limit=2'
+        received_ids = []
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Убедитесь, что GET-запрос с параметром `cursor` к '
+                f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+            )
+            test_data = response.json()
+            assert 'results' in test_data and 'next' in test_data, (
+                'Убедитесь, что GET-запрос с параметром `cursor` к '
+                f'`{self.post_list_url}` возвращает поля `results` и `next`.'
+            )
+            received_ids.extend(item['id'] for item in test_data['results'])
+            url = test_data['next']
+
+        expected_ids = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert received_ids == expected_ids, (
+            'Убедитесь, что курсорная пагинация на '
+            f'`{self.post_list_url}` возвращает все посты без повторов, '
+            'от новых к старым.'
+        )
+
+    def test_posts_search(self, user_client, post, post_2, another_post):
+        url = f'{self.post_list_url}?search=12342341'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что GET-запрос с параметром `search` к '
+            f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+        )
+        assert [item['id'] for item in response.json()] == [post_2.id], (
+            'Убедитесь, что GET-запрос с параметром `search` к '
+            f'`{self.post_list_url}` возвращает только подходящие посты.'
+        )
+
+        post_2.text = 'Совсем другой текст'
+        post_2.save()
+        another_post.delete()
+        response = user_client.get(url)
+        assert response.json() == [], (
+            'Убедитесь, что поисковый индекс обновляется при изменении '
+            'поста.'
+        )
+        response = user_client.get(f'{self.post_list_url}?search=тестовый')
+        assert [item['id'] for item in response.json()] == [post.id], (
+            'Убедитесь, что поиск не находит удалённые посты.'
+        )
+
+        response = user_client.get(
+            f'{self.post_list_url}?search=пост&cursor=&limit=1'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 1, (
+            'Убедитесь, что поиск по постам работает вместе с '
+            'курсорной пагинацией.'
+        )
+
+        response = user_client.get(
+            f'{self.post_list_url}?search=%00тестовый%01'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что управляющие символы в параметре `search` не '
+            'приводят к ошибке сервера.'
+        )
+        assert [item['id'] for item in response.json()] == [post.id], (
+            'Убедитесь, что управляющие символы в `search` считаются '
+            'пробелами.'
+        )
+
     def test_post_create_auth_with_invalid_data(self, user_client):
         posts_count = Post.objects.count()
         response = user_client.post(self.post_list_url, data={})
@@ -243,6 +317,79 @@ class TestPostAPI:
             post
         )
 
+    def test_post_cached_detail_invalidated(self, user_client, user, post):
+        url = self.post_detail_url.format(post_id=post.id)
+        user_client.get(url)
+
+        user.username = 'RenamedUser'
+        user.save()
+        response = user_client.get(url)
+        assert response.json()['author'] == 'RenamedUser', (
+            'Проверьте, что после изменения имени автора ответ на '
+            f'GET-запрос к `{self.post_detail_url}` содержит новое имя.'
+        )
+
+        post.text = 'Обновлённый текст'
+        post.save()
+        response = user_client.get(self.post_list_url)
+        assert response.json()[0]['text'] == 'Обновлённый текст', (
+            'Проверьте, что после изменения поста ответ на GET-запрос к '
+            f'`{self.post_list_url}` содержит актуальный текст.'
+        )
+
+    def test_post_cache_sees_other_process_writes(self, user_client, user,
+                                                  post, monkeypatch):
+        from api import cache
+
+        def in_other_process(write):
+            # У другого воркера свой кэш в памяти: его сигналы не
+            # сбрасывают кэш этого процесса.
+            own_cache = cache.get_object_cache()
+            monkeypatch.setattr(cache, '_object_cache', cache.LRUCache())
+            write()
+            monkeypatch.setattr(cache, '_object_cache', own_cache)
+
+        url = self.post_detail_url.format(post_id=post.id)
+        user_client.get(url)
+        user_client.get(self.post_list_url)
+
+        post.text = 'Изменён в другом процессе'
+        in_other_process(post.save)
+        for response in (
+            user_client.get(url), user_client.get(self.post_list_url)
+        ):
+            data = response.json()
+            data = data[0] if isinstance(data, list) else data
+            assert data['text'] == 'Изменён в другом процессе', (
+                'Проверьте, что кэш постов не отдаёт данные, изменённые '
+                'другим процессом.'
+            )
+
+        user.username = 'RenamedElsewhere'
+        in_other_process(user.save)
+        assert user_client.get(url).json()['author'] == 'RenamedElsewhere'
+
+        in_other_process(post.delete)
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get(self.post_list_url).json() == []
+
+    def test_post_cache_filled_in_batches(self, user_client, user,
+                                          monkeypatch):
+        from api.views import PostViewSet
+
+        monkeypatch.setattr(PostViewSet, 'cache_fill_batch_size', 2)
+        posts = [
+            Post.objects.create(author=user, text=f'Пост {i}')
+            for i in range(5)
+        ]
+        response = user_client.get(f'{self.post_list_url}?limit=5')
+        assert [item['id'] for item in response.json()['results']] == [
+            post.id for post in posts
+        ], (
+            'Проверьте, что недостающие в кэше посты догружаются пачками '
+            'без потерь и в порядке страницы.'
+        )
+
     @pytest.mark.parametrize('http_method', ('put', 'patch'))
     def test_post_change_auth_with_valid_data(self, user_client, post,
                                               another_post, http_method):
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Follow
+
+
+@pytest.mark.django_db(transaction=True)
+class TestProfileAPI:
+
+    url = '/api/v1/profiles/{username}/'
+
+    def test_profile_counts_and_flags(self, user_client, user, another_user,
+                                      follow_1, follow_4, follow_2):
+        url = self.url.format(username=another_user.username)
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == {
+            'id': another_user.id,
+            'username': another_user.username,
+            'followers_count': 1,
+            'following_count': 1,
+            'is_following': True,
+            'follows_you': True,
+        }, (
+            f'Проверьте, что ответ на GET-запрос к `{self.url}` содержит '
+            'счётчики подписок и флаги `is_following` и `follows_you`.'
+        )
+
+        user_client.post(
+            '/api/v1/follow/bulk-delete/',
+            data={'following': [another_user.username]}, format='json'
+        )
+        response = user_client.get(url)
+        assert response.json()['is_following'] is False, (
+            'Проверьте, что флаг `is_following` обновляется после отписки.'
+        )
+        assert response.json()['followers_count'] == 0
+
+    def test_profile_mutual(self, client, user, user_2, another_user,
+                            follow_1, follow_4, follow_2, follow_5):
+        Follow.objects.create(user=another_user, following=user_2)
+        response = client.get(
+            self.url.format(username=user.username) + 'mutual/'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(item['username'] for item in response.json()) == sorted(
+            [another_user.username, user_2.username]
+        ), (
+            f'Проверьте, что `{self.url}mutual/` возвращает пользователей, '
+            'подписанных на владельца профиля взаимно.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowGraph:
+
+    def test_changes_during_build_kept(self, user, user_2, another_user):
+        from api.graph import FollowGraph
+
+        graph = FollowGraph()
+
+        def edges():
+            yield user.id, another_user.id
+            # Сигнал о подписке приходит, пока снимок ещё собирается.
+            graph.add(user.id, user_2.id)
+            graph.remove(user.id, another_user.id)
+
+        graph.build(edges())
+        assert graph.is_following(user.id, user_2.id), (
+            'Проверьте, что подписки, добавленные во время сборки графа, '
+            'не теряются.'
+        )
+        assert not graph.is_following(user.id, another_user.id)
+
+    def test_expired_graph_refreshed_in_background(self, user, user_2):
+        from api.graph import FollowGraph
+
+        graph = FollowGraph(max_age=0)
+        graph.build()
+        # Подписка из другого процесса: сигналы здесь не срабатывают.
+        Follow.objects.bulk_create((Follow(user=user, following=user_2),))
+
+        graph._build_lock.acquire()
+        assert graph.refresh_in_background() is False, (
+            'Проверьте, что граф перестраивает только один поток.'
+        )
+        assert graph.is_following(user.id, user_2.id) is False
+        graph._build_lock.release()
+
+        graph.ensure_built()
+        with graph._build_lock:
+            pass
+        # Иначе каждое чтение запускает ещё одну фоновую сборку.
+        graph.max_age = None
+        assert graph.is_following(user.id, user_2.id), (
+            'Проверьте, что устаревший граф перестраивается в фоне.'
+        )
@@ -0,0 +1,113 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.feed import fan_out_post
+from posts.models import Comment, FeedItem, Follow, Post
+
+
+# Максимальное число SQL-запросов на эндпоинт, включая запрос пользователя
+# при JWT-аутентификации. Бюджет не должен зависеть от количества объектов
+# в ответе. Детальная страница и список без пагинации делают агрегатный
+# запрос для ETag/Last-Modified, страница списка строит их из своих строк.
+# Списки постов и групп при пустом кэше читают id объектов и догружают
+# отсутствующие в кэше.
+QUERY_BUDGETS = (
+    ('/api/v1/posts/', 4),
+    ('/api/v1/posts/?limit=5&offset=5', 4),
+    ('/api/v1/posts/?cursor=', 3),
+    ('/api/v1/posts/?cursor=&expand=comments', 5),
+    ('/api/v1/posts/{post_id}/', 3),
+    ('/api/v1/posts/{post_id}/comments/', 4),
+    ('/api/v1/groups/', 4),
+    ('/api/v1/follow/', 2),
+    ('/api/v1/feed/', 3),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    objects_count = 15
+
+    @pytest.fixture
+    def many_objects(self, django_user_model, user, post):
+        for i in range(self.objects_count):
+            author = django_user_model.objects.create_user(
+                username=f'author_{i}', password='1234567'
+            )
+            Post.objects.create(text=f'Пост {i}', author=author)
+            Comment.objects.create(
+                author=author, post=post, text=f'Коммент {i}'
+            )
+            Follow.objects.create(user=user, following=author)
+        return post
+
+    @pytest.mark.parametrize('url, budget', QUERY_BUDGETS)
+    def test_query_budget(self, user_client, many_objects,
+                          django_assert_max_num_queries, url, budget):
+        url = url.format(post_id=many_objects.id)
+        with django_assert_max_num_queries(budget):
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+
+    def test_comments_post_lookup_cached(self, user_client, post,
+                                         django_assert_num_queries):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        user_client.get(url)
+        # Пользователь и страница комментариев, по которой строится ETag.
+        with django_assert_num_queries(2):
+            user_client.get(url)
+
+        post.delete()
+        assert user_client.get(url).status_code == 404, (
+            'Проверьте, что после удаления поста запрос к его комментариям '
+            'возвращает 404.'
+        )
+
+    def test_posts_page_plan(self, user_client, many_objects):
+        """Страницы постов не читают таблицу постов целиком."""
+        url = '/api/v1/posts/?cursor=&limit=5'
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = user_client.get(url)
+            url = response.json()['next']
+            with connection.cursor() as cursor:
+                for query in queries.captured_queries:
+                    if 'FROM "posts_post"' not in query['sql']:
+                        continue
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plan = [row[-1] for row in cursor.fetchall()]
+                    assert 'SCAN posts_post' not in plan, (
+                        'Проверьте, что ETag и данные страницы постов не '
+                        f'требуют полного просмотра таблицы: {plan}'
+                    )
+
+    def test_feed_page_plan(self, user_client, many_objects):
+        """Лента читается по индексам, без просмотра таблиц целиком."""
+        for post in Post.objects.filter(
+            author__username__in=('author_1', 'author_2')
+        ):
+            fan_out_post(post)
+        assert FeedItem.objects.count() == 2
+        url = '/api/v1/feed/?limit=5'
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = user_client.get(url)
+            url = response.json()['next']
+            plans = []
+            with connection.cursor() as cursor:
+                for query in queries.captured_queries:
+                    if 'posts_' not in query['sql']:
+                        continue
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plans += [row[-1] for row in cursor.fetchall()]
+            for table in ('posts_post', 'posts_feeditem'):
+                assert f'SCAN {table}' not in ' '.join(plans), (
+                    'Проверьте, что лента не требует полного просмотра '
+                    f'таблицы {table}: {plans}'
+                )
+            assert any('post_not_in_feeds_idx' in row for row in plans)
+            assert any('feeditem_user_pub_date_idx' in row for row in plans)
@@ -0,0 +1,79 @@
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.cache import get_object_cache
+from api.readers import (
+    CommentValuesSerializer,
+    GroupValuesSerializer,
+    PostValuesSerializer,
+)
+from api.serializers import (
+    CommentSerializer,
+    GroupSerializer,
+    PostSerializer,
+)
+from posts.models import Comment, Group, Post
+
+
+@pytest.fixture
+def request_context():
+    request = Request(APIRequestFactory().get('/api/v1/posts/'))
+    return {'request': request}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestValuesSerializers:
+
+    @pytest.fixture
+    def objects(self, user, another_user, post, another_post,
+                comment_1_post, comment_2_post, comment_1_another_post):
+        Post.objects.create(author=user, text='Без группы')
+        Post.objects.filter(pk=post.pk).update(
+            image='posts/ab/' + 'ab' * 32 + '.jpg',
+            image_width=640,
+            image_height=480,
+            comments_count=2,
+            image_variants={'thumbnail': 'posts/ab/variants/t.webp'},
+            pub_date=timezone.now().replace(microsecond=0),
+        )
+
+    @pytest.mark.parametrize('model, serializer_class, values_class', (
+        (Post, PostSerializer, PostValuesSerializer),
+        (Comment, CommentSerializer, CommentValuesSerializer),
+        (Group, GroupSerializer, GroupValuesSerializer),
+    ))
+    def test_identical_output(self, objects, request_context, model,
+                              serializer_class, values_class):
+        queryset = model.objects.order_by('id')
+        expected = JSONRenderer().render(
+            serializer_class(queryset, many=True, context=request_context)
+            .data
+        )
+        values_serializer = values_class(context=request_context)
+        actual = JSONRenderer().render(
+            values_serializer.serialize(values_serializer.get_rows(queryset))
+        )
+        assert actual == expected, (
+            f'Проверьте, что `{values_class.__name__}` отдаёт те же данные, '
+            f'что и `{serializer_class.__name__}`.'
+        )
+
+    def test_api_responses_unchanged(self, user_client, objects, post,
+                                     settings):
+        urls = (
+            '/api/v1/posts/',
+            f'/api/v1/posts/{post.id}/',
+            f'/api/v1/posts/{post.id}/comments/',
+            '/api/v1/groups/',
+        )
+        fast = [user_client.get(url).content for url in urls]
+        settings.API_FAST_READ_SERIALIZERS = False
+        get_object_cache().clear()
+        slow = [user_client.get(url).content for url in urls]
+        assert fast == slow, (
+            'Проверьте, что ответы API не зависят от настройки '
+            '`API_FAST_READ_SERIALIZERS`.'
+        )
@@ -0,0 +1,51 @@
+import datetime
+import json
+from decimal import Decimal
+
+import msgpack
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from api.serializers import CommentSerializer, PostSerializer
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRenderers:
+
+    def test_same_content_as_json_renderer(self, post, comment_1_post):
+        data = {
+            'posts': PostSerializer([post], many=True).data,
+            'comments': CommentSerializer([comment_1_post], many=True).data,
+            'raw': {
+                'when': timezone.now().replace(microsecond=123456),
+                'date': datetime.date(2024, 1, 2),
+                'amount': Decimal('1.50'),
+                'text': 'Привет',
+            },
+        }
+        expected = json.loads(JSONRenderer().render(data))
+        assert json.loads(ORJSONRenderer().render(data)) == expected, (
+            'Проверьте, что `ORJSONRenderer` отдаёт то же содержимое, '
+            'что и `JSONRenderer`, включая формат дат.'
+        )
+        assert msgpack.unpackb(MessagePackRenderer().render(data)) == (
+            expected
+        ), (
+            'Проверьте, что `MessagePackRenderer` отдаёт то же содержимое, '
+            'что и `JSONRenderer`.'
+        )
+
+    def test_negotiated_by_accept(self, user_client, post, comment_1_post):
+        for url in ('/api/v1/posts/', f'/api/v1/posts/{post.id}/comments/'):
+            expected = user_client.get(url).json()
+            response = user_client.get(url, HTTP_ACCEPT='application/msgpack')
+            assert response['Content-Type'] == 'application/msgpack', (
+                f'Проверьте, что GET-запрос к `{url}` с заголовком '
+                '`Accept: application/msgpack` возвращает MessagePack.'
+            )
+            assert msgpack.unpackb(response.content) == expected
+            assert response['ETag'] != user_client.get(url)['ETag'], (
+                'Проверьте, что `ETag` зависит от формата ответа.'
+            )
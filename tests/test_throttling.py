@@ -0,0 +1,174 @@
+import datetime
+import multiprocessing
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import (
+    AdaptiveConcurrencyThrottle,
+    ConcurrencyLimiter,
+    GCRAAnonRateThrottle,
+    SQLiteThrottleStore,
+    get_throttle_store,
+    maintenance_wait,
+)
+
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def anon_request():
+    request = APIRequestFactory().get('/api/v1/posts/')
+    request.user = AnonymousUser()
+    return request
+
+
+class TestGCRAThrottle:
+
+    def make_throttle(self, timer, rate='3/min'):
+        throttle = GCRAAnonRateThrottle()
+        throttle.rate = rate
+        throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+        throttle.timer = timer
+        return throttle
+
+    def test_limit_and_wait(self, anon_request):
+        timer = FakeTimer()
+        allowed = [
+            self.make_throttle(timer).allow_request(anon_request, None)
+            for _ in range(4)
+        ]
+        assert allowed == [True, True, True, False], (
+            'Проверьте, что GCRA-throttle пропускает ровно `num_requests` '
+            'запросов подряд.'
+        )
+
+        throttle = self.make_throttle(timer)
+        throttle.allow_request(anon_request, None)
+        assert throttle.wait() == pytest.approx(20.0), (
+            'Проверьте, что `wait()` возвращает время до следующего '
+            'разрешённого запроса.'
+        )
+
+        timer.now += 20
+        assert self.make_throttle(timer).allow_request(anon_request, None)
+        assert not self.make_throttle(timer).allow_request(anon_request, None)
+
+    def test_constant_state(self, anon_request):
+        timer = FakeTimer()
+        throttle = self.make_throttle(timer, rate='1000/day')
+        for _ in range(100):
+            throttle.allow_request(anon_request, None)
+        assert isinstance(get_throttle_store().get(throttle.key), float), (
+            'Проверьте, что GCRA-throttle хранит одно число, '
+            'а не историю запросов.'
+        )
+
+
+def acquire_many(store, start, attempts, results):
+    start.wait()
+    allowed = sum(
+        not store.acquire('shared', 1000.0, 60.0, 3600.0)
+        for _ in range(attempts)
+    )
+    results.put(allowed)
+
+
+class TestSQLiteThrottleStore:
+
+    def test_exact_limit_across_processes(self, tmp_path):
+        store = SQLiteThrottleStore(tmp_path / 'throttle.sqlite3')
+        context = multiprocessing.get_context('fork')
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=acquire_many, args=(store, start, 40, results)
+            )
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        start.set()
+        allowed = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert allowed == 60, (
+            'Проверьте, что общее хранилище throttling пропускает ровно '
+            '`num_requests` запросов, сколько бы процессов их ни делали.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAdaptiveConcurrencyThrottle:
+
+    url = '/api/v1/posts/'
+
+    def test_limit_adapts_to_latency(self):
+        limiter = ConcurrencyLimiter(
+            target_latency=0.1, initial_limit=2, min_limit=1, max_limit=10
+        )
+        assert limiter.acquire() and limiter.acquire()
+        assert not limiter.acquire(), (
+            'Проверьте, что limiter отклоняет запросы сверх предела '
+            'одновременных запросов.'
+        )
+        limiter.release(1.0)
+        assert limiter.limit < 2 and not limiter.acquire(), (
+            'Проверьте, что предел уменьшается, когда задержка выше целевой.'
+        )
+        limiter.release(0.0)
+        assert limiter.in_flight == 0
+
+    def test_overloaded_rejected_with_retry_after(self, client, monkeypatch):
+        limiter = ConcurrencyLimiter(
+            target_latency=0.1, initial_limit=1, min_limit=1, max_limit=1
+        )
+        monkeypatch.setattr(AdaptiveConcurrencyThrottle, 'limiter', limiter)
+        assert client.get(self.url).status_code == HTTPStatus.OK
+        assert limiter.in_flight == 0, (
+            'Проверьте, что завершённый запрос освобождает место.'
+        )
+
+        limiter.in_flight = 1
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что при перегрузке запрос к '
+            f'`{self.url}` отклоняется со статусом 429.'
+        )
+        assert 'Retry-After' in response, (
+            'Проверьте, что отклонённый ответ содержит `Retry-After`.'
+        )
+
+    def test_maintenance_window(self, client, settings):
+        hour = datetime.datetime.now().hour
+        settings.ADAPTIVE_THROTTLE = {'MAINTENANCE_WINDOW': (hour, hour + 1)}
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что в окно обслуживания запросы отклоняются.'
+        )
+        assert 0 < int(response['Retry-After']) <= 3600
+
+    @pytest.mark.parametrize('window, now, wait', (
+        ((3, 5), datetime.datetime(2024, 1, 1, 4, 30), 1800),
+        ((3, 5), datetime.datetime(2024, 1, 1, 5, 0), None),
+        ((23, 2), datetime.datetime(2024, 1, 1, 23, 30), 9000),
+        ((23, 2), datetime.datetime(2024, 1, 2, 1, 0), 3600),
+        ((23, 2), datetime.datetime(2024, 1, 1, 2, 0), None),
+        ((23, 2), datetime.datetime(2024, 1, 1, 12, 0), None),
+    ))
+    def test_maintenance_window_bounds(self, window, now, wait):
+        assert maintenance_wait(window, now) == wait, (
+            'Проверьте, что окно обслуживания может переходить через '
+            'полночь и `Retry-After` указывает на его конец.'
+        )
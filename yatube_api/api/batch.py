@@ -0,0 +1,127 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .serializers import BatchOperationSerializer
+from .throttling import AdaptiveConcurrencyThrottle
+from .views import (
+    CommentsViewSet,
+    FollowViewSet,
+    GroupViewSet,
+    PostViewSet,
+)
+
+BATCH_PATH_PREFIX = "/api/v1/"
+
+
+class BatchView(APIView):
+    """Несколько запросов к API за один HTTP-вызов.
+
+    Тело — список {method, path, body}. Подзапросы выполняются в том же
+    процессе теми же viewset'ами (batch_viewsets) с пользователем,
+    определённым один раз для всего пакета; throttling у каждого
+    подзапроса свой. Подряд идущие GET выполняются параллельно, прочие
+    запросы — по очереди и в порядке списка. Общей транзакции нет.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+    batch_viewsets = (
+        PostViewSet, CommentsViewSet, GroupViewSet, FollowViewSet
+    )
+
+    def get_max_requests(self):
+        return getattr(settings, "API_BATCH_MAX_REQUESTS", 20)
+
+    def post(self, request, *args, **kwargs):
+        serializer = BatchOperationSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data
+        if not operations or len(operations) > self.get_max_requests():
+            raise ValidationError(
+                f"Нужно от 1 до {self.get_max_requests()} запросов"
+            )
+
+        results = []
+        reads = []
+        for operation in operations:
+            if operation["method"] == "GET":
+                reads.append(operation)
+                continue
+            results.extend(self.run_concurrently(reads))
+            reads = []
+            results.append(self.run(operation))
+        results.extend(self.run_concurrently(reads))
+        return Response({"results": results})
+
+    def run_concurrently(self, operations):
+        if len(operations) < 2:
+            return [self.run(operation) for operation in operations]
+        workers = min(
+            len(operations), getattr(settings, "API_BATCH_WORKERS", 4)
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.run_in_thread, operations))
+
+    def run_in_thread(self, operation):
+        try:
+            return self.run(operation)
+        finally:
+            # В потоке нет сигнала request_finished.
+            AdaptiveConcurrencyThrottle.request_finished()
+            connections.close_all()
+
+    def run(self, operation):
+        url = urlsplit(operation["path"])
+        try:
+            if not url.path.startswith(BATCH_PATH_PREFIX):
+                raise Resolver404
+            match = resolve(url.path)
+        except Resolver404:
+            match = None
+        if match is None or getattr(
+            match.func, "cls", None
+        ) not in self.batch_viewsets:
+            return {
+                "status": status.HTTP_404_NOT_FOUND,
+                "body": {"detail": "Страница не найдена."},
+            }
+
+        sub_request = self.make_request(
+            operation["method"], url.path, url.query, operation.get("body")
+        )
+        sub_request.resolver_match = match
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        return {"status": response.status_code, "body": response.data}
+
+    def make_request(self, method, path, query, body):
+        content = b"" if body is None else json.dumps(body).encode()
+        environ = {
+            key: value for key, value in self.request.META.items()
+            if not key.startswith("HTTP_") or key == "HTTP_HOST"
+        }
+        environ.update({
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(content)),
+            "wsgi.input": io.BytesIO(content),
+        })
+        sub_request = WSGIRequest(environ)
+        if self.request.user.is_authenticated:
+            # Пользователь уже определён: подзапрос не аутентифицируется
+            # заново (см. rest_framework.request.Request). Анонимному
+            # подзапросу нечего проверять, и он сохраняет ответ 401.
+            sub_request._force_auth_user = self.request.user
+            sub_request._force_auth_token = self.request.auth
+        return sub_request
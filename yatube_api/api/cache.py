@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.module_loading import import_string
+
+DEFAULT_OBJECT_CACHE = {
+    "BACKEND": "api.cache.LRUCache",
+    "OPTIONS": {"max_entries": 10000, "timeout": 300},
+}
+
+POST_CACHE_PREFIX = "post"
+GROUP_CACHE_PREFIX = "group"
+POST_EXISTS_PREFIX = "post-exists"
+
+_object_cache = None
+
+
+class LRUCache:
+    """Кэш в памяти процесса с вытеснением давно не использованных записей.
+
+    Размер ограничен числом записей max_entries, запись живёт timeout
+    секунд (None — без срока).
+    """
+
+    def __init__(self, max_entries=10000, timeout=None):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, keys):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if key not in self._data:
+                    continue
+                expires, value = self._data[key]
+                if expires is not None and expires <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set(self, key, value):
+        expires = None
+        if self.timeout is not None:
+            expires = time.monotonic() + self.timeout
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCache:
+    """Адаптер к одному из кэшей из настройки CACHES."""
+
+    def __init__(self, alias="default", timeout=None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get_many(self, keys):
+        return self.cache.get_many(keys)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def delete_many(self, keys):
+        self.cache.delete_many(keys)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def get_object_cache():
+    """Бэкенд из настройки API_OBJECT_CACHE, один на процесс."""
+    global _object_cache
+    if _object_cache is None:
+        config = getattr(settings, "API_OBJECT_CACHE", DEFAULT_OBJECT_CACHE)
+        backend = import_string(config["BACKEND"])
+        _object_cache = backend(**config.get("OPTIONS", {}))
+    return _object_cache
+
+
+def object_cache_key(prefix, pk):
+    return f"{prefix}:{pk}"
+
+
+def invalidate_objects(prefix, pks):
+    keys = [object_cache_key(prefix, pk) for pk in pks]
+    if keys:
+        get_object_cache().delete_many(keys)
+
+
+def object_exists(prefix, pk, queryset):
+    """Есть ли объект pk в queryset; положительный ответ кэшируется.
+
+    Запись живёт API_EXISTENCE_CACHE_TIMEOUT секунд (кэш Django общий
+    для процессов только при общем бэкенде), удаление объекта
+    сбрасывает её в api.signals.
+    """
+    key = object_cache_key(prefix, pk)
+    if cache.get(key):
+        return True
+    if not queryset.filter(pk=pk).exists():
+        return False
+    cache.set(
+        key, True, getattr(settings, "API_EXISTENCE_CACHE_TIMEOUT", 30)
+    )
+    return True
+
+
+def forget_existence(prefix, pks):
+    cache.delete_many([object_cache_key(prefix, pk) for pk in pks])
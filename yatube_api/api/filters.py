@@ -0,0 +1,124 @@
+import string
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.functions import Collate
+from rest_framework import filters
+
+from posts.search import search_posts
+
+
+class PostSearchFilter(filters.SearchFilter):
+    """Полнотекстовый ?search= по тексту постов с ранжированием bm25."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return search_posts(queryset, query).order_by("search_rank", "id")
+
+
+# NOCASE в SQLite приводит к нижнему регистру только ASCII.
+NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def nocase_range(prefix):
+    """Границы [low, high) строк с началом prefix в порядке NOCASE.
+
+    Сравнение идёт после замены A-Z на a-z, поэтому границы строятся
+    по такой же строке, а за «@» следует «[», а не «A».
+    """
+    low = prefix.translate(NOCASE_FOLD)
+    last = chr(ord(low[-1]) + 1)
+    if last in string.ascii_uppercase:
+        last = "["
+    return low, low[:-1] + last
+
+
+def prefix_condition(field, prefix):
+    """Условие «field начинается с prefix» без учёта регистра.
+
+    В SQLite это диапазон по field COLLATE NOCASE (см. nocase_range):
+    в отличие от LIKE с ESCAPE, который строит istartswith, по нему
+    можно искать в индексе auth_user_username_nocase. Требует алиаса из
+    prefix_aliases.
+    """
+    if connection.vendor != "sqlite":
+        return Q(**{f"{field}__istartswith": prefix})
+    low, high = nocase_range(prefix)
+    alias = prefix_alias_name(field)
+    return Q(**{f"{alias}__gte": low, f"{alias}__lt": high})
+
+
+def indexed_prefix_condition(model, field, prefix):
+    """prefix_condition для поля связанной модели через подзапрос.
+
+    Условие на колонку после JOIN планировщик проверяет на каждой
+    строке основной выборки; подзапрос relation__in (...) сначала
+    находит подходящие строки связанной модели по индексу.
+    """
+    relation, _, column = field.partition("__")
+    if not column or "__" in column:
+        return prefix_condition(field, prefix)
+    related = model._meta.get_field(relation).related_model
+    ids = related.objects.alias(**prefix_aliases((column,))).filter(
+        prefix_condition(column, prefix)
+    ).values("pk")
+    return Q(**{f"{relation}__in": ids})
+
+
+def prefix_alias_name(field):
+    return f"{field}_nocase"
+
+
+def prefix_aliases(fields):
+    if connection.vendor != "sqlite":
+        return {}
+    return {
+        prefix_alias_name(field): Collate(field, "NOCASE") for field in fields
+    }
+
+
+class UsernameSearchFilter(filters.SearchFilter):
+    """?search= по именам пользователей из search_fields.
+
+    По умолчанию ищет подстроку, как SearchFilter, но первыми отдаёт
+    совпадения по началу имени. ?search=^q ищет только по началу имени
+    и для ввода с автодополнением обходится запросом по индексу.
+    """
+
+    prefix_marker = "^"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        fields = getattr(view, "search_fields", ())
+        if not query or not fields:
+            return queryset
+
+        prefix_only = query.startswith(self.prefix_marker)
+        prefix = query.lstrip(self.prefix_marker)
+        if not prefix:
+            return queryset
+        if prefix_only:
+            indexed_match = Q()
+            for field in fields:
+                indexed_match |= indexed_prefix_condition(
+                    queryset.model, field, prefix
+                )
+            return queryset.filter(indexed_match).order_by(*fields)
+
+        queryset = queryset.alias(**prefix_aliases(fields))
+        prefix_match = Q()
+        for field in fields:
+            prefix_match |= prefix_condition(field, prefix)
+
+        substring_match = Q()
+        for field in fields:
+            substring_match |= Q(**{f"{field}__icontains": prefix})
+        return queryset.filter(substring_match).annotate(
+            prefix_rank=Case(
+                When(prefix_match, then=0),
+                default=1,
+                output_field=IntegerField(),
+            )
+        ).order_by("prefix_rank", *fields)
@@ -0,0 +1,207 @@
+import logging
+from array import array
+from bisect import bisect_left
+from threading import Lock, RLock, Thread
+from time import monotonic
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from posts.models import Follow
+
+logger = logging.getLogger(__name__)
+
+_follow_graph = None
+
+
+def _insert(ids, value):
+    position = bisect_left(ids, value)
+    if position == len(ids) or ids[position] != value:
+        ids.insert(position, value)
+
+
+def _remove(ids, value):
+    position = bisect_left(ids, value)
+    if position < len(ids) and ids[position] == value:
+        del ids[position]
+
+
+def _contains(ids, value):
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+class FollowGraph:
+    """Граф подписок в памяти процесса.
+
+    Для каждого пользователя хранятся отсортированные массивы id тех,
+    на кого он подписан, и его подписчиков. Граф строится при старте
+    процесса (build_follow_graph в wsgi/asgi) или при первом обращении,
+    дальше обновляется сигналами (api.signals) и раз в max_age секунд
+    перестраивается в фоновом потоке, чтобы подхватить изменения из
+    других процессов; запросы тем временем читают старый граф. Строит
+    граф один поток за раз, а изменения, пришедшие во время сборки,
+    повторяются на новом графе перед заменой.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self.built_at = None
+        self._following = {}
+        self._followers = {}
+        self._pending = None
+        self._lock = RLock()
+        self._build_lock = Lock()
+
+    def build(self, edges=None):
+        with self._build_lock:
+            self._build(edges)
+
+    def _build(self, edges):
+        with self._lock:
+            self._pending = []
+        try:
+            if edges is None:
+                edges = Follow.objects.values_list(
+                    "user_id", "following_id"
+                ).iterator(chunk_size=10000)
+            following, followers = {}, {}
+            for user_id, following_id in edges:
+                following.setdefault(user_id, []).append(following_id)
+                followers.setdefault(following_id, []).append(user_id)
+            following = {
+                pk: array("q", sorted(ids)) for pk, ids in following.items()
+            }
+            followers = {
+                pk: array("q", sorted(ids)) for pk, ids in followers.items()
+            }
+            with self._lock:
+                for apply, user_id, following_id in self._pending:
+                    apply(following, followers, user_id, following_id)
+                self._following, self._followers = following, followers
+                self.built_at = monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def refresh_in_background(self):
+        """Перестроить граф в фоне, если его уже не строит другой поток."""
+        if not self._build_lock.acquire(blocking=False):
+            return False
+
+        def refresh():
+            try:
+                self._build(None)
+            except Exception:
+                logger.exception("Не удалось перестроить граф подписок")
+            finally:
+                # Соединение закрывается до снятия блокировки: дождавшийся
+                # её поток не должен встретить незавершённое чтение.
+                connection.close()
+                self._build_lock.release()
+
+        Thread(target=refresh, name="follow-graph", daemon=True).start()
+        return True
+
+    def ensure_built(self):
+        if self.built_at is None:
+            with self._build_lock:
+                # Пока ждали, граф мог построить другой поток.
+                if self.built_at is None:
+                    self._build(None)
+        elif (
+            self.max_age is not None
+            and monotonic() - self.built_at > self.max_age
+        ):
+            self.refresh_in_background()
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    @staticmethod
+    def _add_edge(following, followers, user_id, following_id):
+        _insert(following.setdefault(user_id, array("q")), following_id)
+        _insert(followers.setdefault(following_id, array("q")), user_id)
+
+    @staticmethod
+    def _remove_edge(following, followers, user_id, following_id):
+        _remove(following.get(user_id, array("q")), following_id)
+        _remove(followers.get(following_id, array("q")), user_id)
+
+    def _apply(self, change, user_id, following_id):
+        with self._lock:
+            if self._pending is not None:
+                # Снимок БД в сборке может не видеть это изменение.
+                self._pending.append((change, user_id, following_id))
+            if self.is_built:
+                change(self._following, self._followers, user_id,
+                       following_id)
+
+    def add(self, user_id, following_id):
+        self._apply(self._add_edge, user_id, following_id)
+
+    def remove(self, user_id, following_id):
+        self._apply(self._remove_edge, user_id, following_id)
+
+    def following_count(self, user_id):
+        self.ensure_built()
+        return len(self._following.get(user_id, ()))
+
+    def followers_count(self, user_id):
+        self.ensure_built()
+        return len(self._followers.get(user_id, ()))
+
+    def is_following(self, user_id, following_id):
+        self.ensure_built()
+        return _contains(self._following.get(user_id, ()), following_id)
+
+    def mutual(self, user_id):
+        """id пользователей, с которыми user_id подписан взаимно."""
+        self.ensure_built()
+        following = self._following.get(user_id, ())
+        followers = self._followers.get(user_id, ())
+        if len(following) > len(followers):
+            following, followers = followers, following
+        return [pk for pk in following if _contains(followers, pk)]
+
+
+def get_follow_graph():
+    global _follow_graph
+    if _follow_graph is None:
+        _follow_graph = FollowGraph(
+            max_age=getattr(settings, "FOLLOW_GRAPH_MAX_AGE", None)
+        )
+    return _follow_graph
+
+
+def build_follow_graph():
+    """Построить граф при старте процесса, до первых запросов."""
+    try:
+        get_follow_graph().build()
+    except DatabaseError:
+        # Например, до применения миграций: граф построится при первом
+        # обращении.
+        logger.exception("Не удалось построить граф подписок")
+
+
+def record_follows(user_id, following_ids):
+    """Добавить рёбра в граф после фиксации транзакции."""
+    graph = get_follow_graph()
+
+    def add_edges():
+        for following_id in following_ids:
+            graph.add(user_id, following_id)
+
+    transaction.on_commit(add_edges)
+
+
+def record_unfollows(user_id, following_ids):
+    """Удалить рёбра из графа после фиксации транзакции."""
+    graph = get_follow_graph()
+
+    def remove_edges():
+        for following_id in following_ids:
+            graph.remove(user_id, following_id)
+
+    transaction.on_commit(remove_edges)
@@ -0,0 +1,98 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.graph import FollowGraph
+from posts.models import Follow, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает граф подписок в памяти с запросами через ORM. "
+        "Тестовые данные создаются в транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50000)
+        parser.add_argument("--edges", type=int, default=1000000)
+        parser.add_argument("--samples", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def timed(self, label, samples, func):
+        start = perf_counter()
+        for user_id, other_id in samples:
+            func(user_id, other_id)
+        elapsed = perf_counter() - start
+        self.stdout.write(
+            f"  {label}: {elapsed / len(samples) * 1e6:.1f} мкс/операция"
+        )
+
+    def run(self, options):
+        rng = random.Random(0)
+        self.stdout.write("Создание данных...")
+        prefix = f"bench{rng.getrandbits(32)}_"
+        User.objects.bulk_create(
+            (User(username=f"{prefix}{i}") for i in range(options["users"])),
+            batch_size=5000,
+        )
+        ids = list(
+            User.objects.filter(username__startswith=prefix)
+            .values_list("id", flat=True)
+        )
+        edges = set()
+        while len(edges) < options["edges"]:
+            user_id, following_id = rng.sample(ids, 2)
+            edges.add((user_id, following_id))
+        Follow.objects.bulk_create(
+            (Follow(user_id=a, following_id=b) for a, b in edges),
+            batch_size=5000,
+        )
+        samples = [
+            tuple(rng.sample(ids, 2)) for _ in range(options["samples"])
+        ]
+
+        start = perf_counter()
+        graph = FollowGraph()
+        graph.build()
+        self.stdout.write(
+            f"Построение графа: {perf_counter() - start:.2f} с "
+            f"для {Follow.objects.count()} подписок"
+        )
+
+        self.stdout.write("ORM")
+        self.timed("число подписчиков", samples, lambda a, b: (
+            Follow.objects.filter(following_id=a).count()
+        ))
+        self.timed("подписан ли", samples, lambda a, b: (
+            Follow.objects.filter(user_id=a, following_id=b).exists()
+        ))
+        self.timed("взаимные подписки", samples, lambda a, b: list(
+            Follow.objects.filter(
+                user_id=a,
+                following_id__in=Follow.objects.filter(
+                    following_id=a
+                ).values("user_id"),
+            ).values_list("following_id", flat=True)
+        ))
+
+        self.stdout.write("Граф в памяти")
+        self.timed("число подписчиков", samples, lambda a, b: (
+            graph.followers_count(a)
+        ))
+        self.timed("подписан ли", samples, graph.is_following)
+        self.timed("взаимные подписки", samples, lambda a, b: (
+            graph.mutual(a)
+        ))
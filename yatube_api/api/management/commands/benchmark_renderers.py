@@ -0,0 +1,57 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость JSONRenderer из DRF, ORJSONRenderer и "
+        "MessagePackRenderer на странице постов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now().isoformat()
+        page = {
+            "count": options["objects"],
+            "next": "http://testserver/api/v1/posts/?limit=100&offset=100",
+            "previous": None,
+            "results": [
+                {
+                    "author": f"author_{i}",
+                    "group": i % 10 or None,
+                    "id": i,
+                    "image": f"http://testserver/media/posts/{i:064x}.jpg",
+                    "image_width": 1280,
+                    "image_height": 960,
+                    "text": "Текст поста " * 20,
+                    "pub_date": now,
+                    "comments_count": i % 50,
+                    "image_variants": {
+                        "thumbnail": "http://testserver/media/t.webp",
+                        "large": "http://testserver/media/l.webp",
+                    },
+                }
+                for i in range(options["objects"])
+            ],
+        }
+        baseline = None
+        for renderer in (
+            JSONRenderer(), ORJSONRenderer(), MessagePackRenderer()
+        ):
+            start = perf_counter()
+            for _ in range(options["repeat"]):
+                body = renderer.render(page, renderer.media_type, {})
+            elapsed = (perf_counter() - start) / options["repeat"]
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{type(renderer).__name__}: {elapsed * 1e6:.0f} мкс, "
+                f"{len(body)} байт, ускорение {baseline / elapsed:.1f}x"
+            )
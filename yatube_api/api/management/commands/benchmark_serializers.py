@@ -0,0 +1,98 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.readers import (
+    CommentValuesSerializer,
+    GroupValuesSerializer,
+    PostValuesSerializer,
+)
+from api.serializers import (
+    CommentSerializer,
+    GroupSerializer,
+    PostSerializer,
+)
+from posts.models import Comment, Group, Post, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость ModelSerializer и сериализаторов по "
+        ".values() из api.readers. Тестовые данные создаются в "
+        "транзакции и откатываются."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def timed(self, label, repeat, count, func):
+        start = perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (perf_counter() - start) / repeat
+        self.stdout.write(
+            f"  {label}: {elapsed * 1000:.1f} мс, "
+            f"{count / elapsed:.0f} объектов/с"
+        )
+        return elapsed
+
+    def run(self, options):
+        total = options["objects"]
+        self.stdout.write("Создание данных...")
+        author = User.objects.create(username="benchmark_serializers")
+        group = Group.objects.create(
+            title="Бенчмарк", slug="benchmark-serializers", description=""
+        )
+        Post.objects.bulk_create(
+            (Post(author=author, group=group, text=f"Пост {i}")
+             for i in range(total)),
+            batch_size=1000,
+        )
+        post = Post.objects.filter(author=author).first()
+        Comment.objects.bulk_create(
+            (Comment(author=author, post=post, text=f"Комментарий {i}")
+             for i in range(total)),
+            batch_size=1000,
+        )
+
+        context = {
+            "request": Request(APIRequestFactory().get("/api/v1/posts/"))
+        }
+        cases = (
+            (Post.objects.filter(author=author).select_related("author"),
+             PostSerializer, PostValuesSerializer),
+            (Comment.objects.filter(post=post).select_related("author"),
+             CommentSerializer, CommentValuesSerializer),
+            (Group.objects.all(), GroupSerializer, GroupValuesSerializer),
+        )
+        for queryset, serializer_class, values_class in cases:
+            count = queryset.count()
+            self.stdout.write(f"{serializer_class.__name__} ({count})")
+            drf = self.timed("ModelSerializer", options["repeat"], count, (
+                lambda: serializer_class(
+                    queryset.all(), many=True, context=context
+                ).data
+            ))
+            values_serializer = values_class(context=context)
+            fast = self.timed(".values()", options["repeat"], count, (
+                lambda: values_serializer.serialize(
+                    values_serializer.get_rows(queryset.all())
+                )
+            ))
+            self.stdout.write(f"  ускорение: {drf / fast:.1f}x")
@@ -0,0 +1,72 @@
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework import throttling
+
+from api.throttling import (
+    CacheThrottleStore,
+    GCRAUserRateThrottle,
+    SQLiteThrottleStore,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает стоимость одного запроса для UserRateThrottle из DRF "
+        "и GCRAUserRateThrottle при большой истории запросов. Состояние "
+        "хранится во временном кеше и временном файле SQLite, рабочее "
+        "хранилище THROTTLE_STORE не затрагивается."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--window", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        request = RequestFactory().get("/api/v1/posts/")
+        request.user = AnonymousUser()
+        request.META["REMOTE_ADDR"] = "127.0.0.1"
+        # Оба алгоритма сначала работают с одним и тем же LocMemCache,
+        # чтобы сравнение не зависело от хранилища.
+        cache = LocMemCache("benchmark-throttling", {})
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite_store = SQLiteThrottleStore(
+                Path(directory) / "throttle.sqlite3"
+            )
+            benchmarks = (
+                ("UserRateThrottle, LocMemCache",
+                 throttling.UserRateThrottle, {"cache": cache}),
+                ("GCRAUserRateThrottle, LocMemCache",
+                 GCRAUserRateThrottle,
+                 {"get_store": lambda self: CacheThrottleStore(cache)}),
+                ("GCRAUserRateThrottle, SQLite",
+                 GCRAUserRateThrottle,
+                 {"get_store": lambda self: sqlite_store}),
+            )
+            for title, base, attrs in benchmarks:
+                cache.clear()
+                sqlite_store.clear()
+                throttle_class = type(base.__name__, (base,), {
+                    "THROTTLE_RATES": {"user": f"{total}/day"}, **attrs
+                })
+                self.stdout.write(title)
+                self.measure(throttle_class, request, total, options["window"])
+            sqlite_store.connection.close()
+
+    def measure(self, throttle_class, request, total, window):
+        start = perf_counter()
+        for done in range(1, total + 1):
+            throttle_class().allow_request(request, None)
+            if done % window == 0:
+                elapsed = perf_counter() - start
+                self.stdout.write(
+                    f"  запросы {done - window + 1}-{done}: "
+                    f"{elapsed / window * 1e6:.1f} мкс/запрос"
+                )
+                start = perf_counter()
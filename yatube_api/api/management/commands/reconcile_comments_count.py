@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.cache import POST_CACHE_PREFIX, invalidate_objects
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет Post.comments_count с числом комментариев и исправляет "
+        "расхождения (комментарии, удалённые каскадом или через админку)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        counts = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        actual = Coalesce(Subquery(counts), 0)
+        drifted = list(
+            Post.objects.annotate(actual=actual)
+            .exclude(comments_count=F("actual"))
+            .values_list("id", flat=True)
+        )
+        if not options["dry_run"]:
+            batch_size = options["batch_size"]
+            for start in range(0, len(drifted), batch_size):
+                batch = drifted[start:start + batch_size]
+                Post.objects.filter(id__in=batch).update(
+                    comments_count=actual, updated_at=timezone.now()
+                )
+                invalidate_objects(POST_CACHE_PREFIX, batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"Постов с неверным числом комментариев: {len(drifted)}"
+        ))
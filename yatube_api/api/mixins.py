@@ -0,0 +1,344 @@
+from calendar import timegm
+from hashlib import md5
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .cache import get_object_cache, object_cache_key
+from .readers import fast_read_enabled
+
+
+class PageNotModified(Exception):
+    """Страница списка не изменилась: ответ 304 готов до сериализации."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """ETag для list/retrieve, ответ 304 без сериализации.
+
+    Детальная страница и список без пагинации проверяются одним
+    агрегатным запросом: максимум updated_at и число объектов в выборке.
+    Для страницы списка валидаторы строятся из id и updated_at её строк,
+    которые пагинация и так читает (поэтому updated_at должен быть в
+    list_only_fields), и состояния пагинатора: их цена не зависит от
+    размера таблицы и глубины страницы. Изменения, не обновляющие
+    updated_at (смена имени автора, удаление группы), компенсируются в
+    api.signals. Если в ответ входят связанные объекты, их выборки
+    возвращает get_related_validator_querysets. Last-Modified отдаётся
+    только детальной странице: у списка удаление строки его не меняет.
+    """
+
+    def get_related_validator_querysets(self, pks):
+        """Выборки связанных объектов для pks (список или подзапрос)."""
+        return ()
+
+    def make_validators(self, parts, stamps):
+        parts = [
+            self.request.get_full_path(),
+            self.request.accepted_media_type or "",
+            self.request.headers.get(self.get_opt_out_header() or "", ""),
+            *parts,
+        ]
+        last_modified = None
+        for stamp in stamps:
+            modified = stamp["last_modified"]
+            parts.append(str(stamp["count"]))
+            parts.append(modified.isoformat() if modified else "")
+            if modified is not None:
+                last_modified = max(last_modified or modified, modified)
+        etag = '"%s"' % md5("|".join(parts).encode()).hexdigest()
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        return etag, last_modified
+
+    def aggregate_stamps(self, queryset):
+        return queryset.aggregate(
+            last_modified=Max("updated_at"), count=Count("pk")
+        )
+
+    def get_validators(self, queryset):
+        self.validator_stamps = self.aggregate_stamps(queryset)
+        related = self.get_related_validator_querysets(queryset.values("pk"))
+        return self.make_validators((), [
+            self.validator_stamps,
+            *(self.aggregate_stamps(related_queryset)
+              for related_queryset in related),
+        ])
+
+    def get_page_validators(self, page):
+        versions = [
+            (item["id"], item["updated_at"]) if isinstance(item, dict)
+            else (item.pk, item.updated_at)
+            for item in page
+        ]
+        paginator = (
+            getattr(self.paginator, "cursor_paginator", None)
+            or self.paginator
+        )
+        parts = [f"{pk}:{modified.isoformat()}" for pk, modified in versions]
+        # Ссылки next/previous и count в ответе зависят не только от
+        # строк страницы.
+        parts.extend(
+            str(getattr(paginator, name, None))
+            for name in ("count", "has_next", "has_previous")
+        )
+        related = self.get_related_validator_querysets(
+            [pk for pk, _ in versions]
+        )
+        return self.make_validators(parts, [
+            {
+                "last_modified": max(
+                    (modified for _, modified in versions), default=None
+                ),
+                "count": len(versions),
+            },
+            *(self.aggregate_stamps(related_queryset)
+              for related_queryset in related),
+        ])
+
+    def get_object_versions(self, pks):
+        # Для детальной страницы updated_at объекта уже прочитан
+        # агрегатом валидаторов.
+        stamps = getattr(self, "validator_stamps", None)
+        if (
+            self.action == "retrieve" and stamps is not None
+            and stamps["count"] == 1 and len(pks) == 1
+        ):
+            return {pks[0]: stamps["last_modified"]}
+        return super().get_object_versions(pks)
+
+    def get_opt_out_header(self):
+        # Заголовок отказа от пагинации меняет форму ответа.
+        return getattr(self.paginator, "opt_out_header", None)
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            opt_out_header = self.get_opt_out_header()
+            if opt_out_header:
+                patch_vary_headers(response, (opt_out_header,))
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def conditional_response(self, queryset, handler, request, *args,
+                             **kwargs):
+        etag, last_modified = self.get_validators(queryset)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if self.action != "list" or hasattr(self, "list_validators"):
+            return page
+        if page is None:
+            etag, _ = self.get_validators(queryset)
+        else:
+            etag, _ = self.get_page_validators(page)
+        # Максимум updated_at не меняется при удалении строки, поэтому
+        # списки проверяются только по ETag: в нём есть число и id строк.
+        self.list_validators = (etag, None)
+        response = get_conditional_response(self.request, etag=etag)
+        if response is not None:
+            raise PageNotModified(response)
+        return page
+
+    def list(self, request, *args, **kwargs):
+        try:
+            response = super().list(request, *args, **kwargs)
+        except PageNotModified as not_modified:
+            response = not_modified.response
+        validators = getattr(self, "list_validators", None)
+        if validators is None:
+            return response
+        return self.add_validators(response, *validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError):
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            queryset, super().retrieve, request, *args, **kwargs
+        )
+
+
+class ValuesReadMixin:
+    """Списки через values_serializer_class (api.readers), если он задан.
+
+    Настройка API_FAST_READ_SERIALIZERS = False возвращает обычные
+    сериализаторы. ?fields=a,b оставляет в ответе только эти поля и
+    выбирает из БД только нужные для них колонки (без JOIN автора,
+    если он не запрошен); в list_only_fields — колонки, которые нужны
+    всегда, например для курсорной пагинации.
+    """
+
+    values_serializer_class = None
+    fields_query_param = "fields"
+    list_only_fields = ("id",)
+
+    def get_requested_fields(self):
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = self.parse_requested_fields()
+        return self._requested_fields
+
+    def parse_requested_fields(self):
+        value = self.request.query_params.get(self.fields_query_param)
+        if (
+            not value or self.values_serializer_class is None
+            or self.action not in ("list", "retrieve")
+        ):
+            return None
+        fields = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = fields - set(self.values_serializer_class.columns)
+        if unknown:
+            raise ValidationError({self.fields_query_param: (
+                "Неизвестные поля: %s" % ", ".join(sorted(unknown))
+            )})
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        columns = self.values_serializer_class(fields=fields).get_columns()
+        if not any("__" in column for column in columns):
+            queryset = queryset.select_related(None)
+        return queryset.only(*columns, *self.list_only_fields)
+
+    def get_values_serializer(self, fields=None):
+        if self.values_serializer_class is None or not fast_read_enabled():
+            return None
+        return self.values_serializer_class(
+            context=self.get_serializer_context(), fields=fields
+        )
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer(
+            self.get_requested_fields()
+        )
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = values_serializer.get_rows(queryset, extra=(
+            *self.list_only_fields, *queryset.query.annotations
+        ))
+        page = self.paginate_queryset(rows)
+        data = values_serializer.serialize(page if page is not None else rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class CachedObjectMixin(ValuesReadMixin):
+    """Отдаёт сериализованные объекты из кэша api.cache.
+
+    Запись в кэше помечена updated_at объекта и используется, только
+    пока он совпадает с updated_at в БД: так изменения из других
+    процессов, где сигналы этого процесса не срабатывают, видны сразу.
+    Детальная страница сверяет версию одним запросом по первичному
+    ключу. Список выбирает из БД id с updated_at (и поля сортировки), а
+    недостающие в кэше объекты догружает пачками по
+    cache_fill_batch_size. Список без пагинации читается в обход кэша.
+    Инвалидация — в api.signals.
+    """
+
+    object_cache_prefix = None
+    cache_fill_batch_size = 500
+
+    def get_object_versions(self, pks):
+        return dict(
+            self.get_queryset().filter(pk__in=pks)
+            .values_list("pk", "updated_at")
+        )
+
+    def get_cached_payloads(self, versions):
+        """Данные объектов по {pk: updated_at} в том же порядке."""
+        cache = get_object_cache()
+        base_uri = self.request.build_absolute_uri("/")
+        keys = {pk: object_cache_key(self.object_cache_prefix, pk)
+                for pk in versions}
+        cached = cache.get_many(keys.values())
+        payloads = {}
+        for pk, key in keys.items():
+            # В данных есть абсолютные ссылки на файлы, поэтому запись
+            # действительна только для того же хоста.
+            if key in cached and cached[key][:2] == (base_uri, versions[pk]):
+                payloads[pk] = cached[key][2]
+        missing = [pk for pk in versions if pk not in payloads]
+        for start in range(0, len(missing), self.cache_fill_batch_size):
+            batch = missing[start:start + self.cache_fill_batch_size]
+            for pk, version, item in self.serialize_objects(
+                self.get_queryset().filter(pk__in=batch)
+            ):
+                payloads[pk] = item
+                cache.set(keys[pk], (base_uri, version, item))
+        return [payloads[pk] for pk in versions if pk in payloads]
+
+    def serialize_objects(self, queryset):
+        """Тройки (pk, updated_at, данные)."""
+        values_serializer = self.get_values_serializer()
+        if values_serializer is not None:
+            rows = list(values_serializer.get_rows(
+                queryset, extra=("updated_at",)
+            ))
+            data = values_serializer.serialize(rows)
+            return [
+                (row["id"], row["updated_at"], item)
+                for row, item in zip(rows, data)
+            ]
+        objects = list(queryset)
+        data = self.get_serializer(objects, many=True).data
+        return [
+            (obj.pk, obj.updated_at, item)
+            for obj, item in zip(objects, data)
+        ]
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.get_requested_fields() is not None:
+            # В кэше только полные ответы.
+            return super().retrieve(request, *args, **kwargs)
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            pk = int(lookup)
+        except ValueError:
+            return super().retrieve(request, *args, **kwargs)
+        payloads = self.get_cached_payloads(self.get_object_versions([pk]))
+        if not payloads:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(payloads[0])
+
+    def list(self, request, *args, **kwargs):
+        if self.get_requested_fields() is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            queryset.select_related(None)
+            .only(*self.list_only_fields, "updated_at")
+        )
+        if page is None:
+            return super().list(request, *args, **kwargs)
+        payloads = self.get_cached_payloads(
+            {obj.pk: obj.updated_at for obj in page}
+        )
+        return self.get_paginated_response(payloads)
@@ -1,5 +1,86 @@
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
 
 
-class CommentPagination(PageNumberPagination):
-    page_size = 5
+class BoundedCursorPagination(CursorPagination):
+    """Курсорная пагинация с возможностью отказа для старых клиентов.
+
+    Клиент, который ещё не умеет ходить по next/previous, передаёт
+    заголовок X-Pagination: none и получает простой список, но не
+    длиннее API_UNPAGINATED_MAX_RESULTS объектов.
+    """
+
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
+    opt_out_header = "X-Pagination"
+    opt_out_value = "none"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.unpaginated = (
+            request.headers.get(self.opt_out_header, "").lower()
+            == self.opt_out_value
+        )
+        if self.unpaginated:
+            limit = getattr(settings, "API_UNPAGINATED_MAX_RESULTS", 1000)
+            return list(queryset.order_by(*self.ordering)[:limit])
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.unpaginated:
+            return Response(data)
+        return super().get_paginated_response(data)
+
+
+class CommentPagination(BoundedCursorPagination):
+    ordering = ("created", "id")
+
+
+class GroupPagination(BoundedCursorPagination):
+    ordering = ("id",)
+
+
+class FeedPagination(BoundedCursorPagination):
+    """Страницы ленты (posts.feed.Timeline) по (pub_date, id)."""
+
+    ordering = ("-pub_date", "-id")
+
+
+class PostCursorPagination(CursorPagination):
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET."""
+
+    ordering = ("-pub_date", "-id")
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations:
+            return ("search_rank", "id")
+        return super().get_ordering(request, queryset, view)
+
+
+class PostPagination(LimitOffsetPagination):
+    """limit/offset по умолчанию, курсор — при наличии ?cursor=.
+
+    Пустой ?cursor= открывает первую страницу в курсорном режиме,
+    дальше клиент идёт по ссылкам next/previous.
+    """
+
+    cursor_pagination_class = PostCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,119 @@
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework import serializers
+
+from posts.models import Post
+
+
+class ValuesSerializer:
+    """Сериализация только для чтения по строкам .values().
+
+    Не создаёт экземпляры моделей и объекты полей DRF на каждую строку,
+    но отдаёт те же данные, что соответствующий ModelSerializer
+    (проверяется в tests/test_readers.py). Запись идёт через обычные
+    сериализаторы.
+
+    columns сопоставляет поле ответа с колонкой .values() в порядке
+    Meta.fields сериализатора; поле с особым представлением задаётся
+    методом represent_<поле>(row). fields оставляет только часть полей
+    и только нужные для них колонки.
+    """
+
+    columns = {}
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.request = self.context.get("request")
+        self.field_names = [
+            name for name in self.columns
+            if fields is None or name in fields
+        ]
+        self.getters = [
+            (name, getattr(self, f"represent_{name}", None)
+             or itemgetter(self.columns[name]))
+            for name in self.field_names
+        ]
+
+    def get_columns(self):
+        return list(dict.fromkeys(
+            self.columns[name] for name in self.field_names
+        ))
+
+    def get_rows(self, queryset, extra=()):
+        return queryset.values(*dict.fromkeys((*self.get_columns(), *extra)))
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+    def absolute_url(self, url):
+        if self.request is None:
+            return url
+        return self.request.build_absolute_uri(url)
+
+
+class PostValuesSerializer(ValuesSerializer):
+    columns = {
+        "author": "author__username",
+        "group": "group",
+        "id": "id",
+        "image": "image",
+        "image_width": "image_width",
+        "image_height": "image_height",
+        "text": "text",
+        "pub_date": "pub_date",
+        "comments_count": "comments_count",
+        "image_variants": "image_variants",
+    }
+
+    def __init__(self, context=None, fields=None):
+        self.storage = Post._meta.get_field("image").storage
+        self.datetime = serializers.DateTimeField()
+        super().__init__(context, fields)
+
+    def represent_image(self, row):
+        image = row["image"]
+        return self.absolute_url(self.storage.url(image)) if image else None
+
+    def represent_pub_date(self, row):
+        return self.datetime.to_representation(row["pub_date"])
+
+    def represent_image_variants(self, row):
+        return {
+            variant: self.absolute_url(self.storage.url(name))
+            for variant, name in (row["image_variants"] or {}).items()
+        }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    columns = {
+        "id": "id",
+        "author": "author__username",
+        "post": "post",
+        "text": "text",
+        "created": "created",
+    }
+
+    def __init__(self, context=None, fields=None):
+        self.datetime = serializers.DateTimeField()
+        super().__init__(context, fields)
+
+    def represent_created(self, row):
+        return self.datetime.to_representation(row["created"])
+
+
+class GroupValuesSerializer(ValuesSerializer):
+    columns = {
+        "description": "description",
+        "id": "id",
+        "slug": "slug",
+        "title": "title",
+    }
+
+
+def fast_read_enabled():
+    return getattr(settings, "API_FAST_READ_SERIALIZERS", True)
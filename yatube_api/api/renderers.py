@@ -0,0 +1,46 @@
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer на orjson.
+
+    Типы, которые orjson кодирует иначе (datetime, Decimal, ленивые
+    строки), передаются в encoders.JSONEncoder из DRF, поэтому
+    содержимое ответа то же. Отступ поддерживается только в 2 пробела.
+    """
+
+    def __init__(self):
+        self.default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self.default, option=options)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Двоичный формат MessagePack (Accept: application/msgpack).
+
+    Значения, которых нет в MessagePack, кодируются так же, как в JSON.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def __init__(self):
+        self.default = encoders.JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=self.default, use_bin_type=True, datetime=False
+        )
@@ -2,14 +2,29 @@ from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 
 
-from posts.models import Comment, Post, Group, Follow
+from posts.images import variant_urls
+from posts.models import Comment, Post, Group, Follow, User
+from .graph import get_follow_graph
+from .uploads import HeaderImageField
 
 
-class PostSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Сериализатор, который принимает fields — подмножество своих полей."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(slug_field="username", read_only=True)
     group = serializers.PrimaryKeyRelatedField(
         queryset=Group.objects.all(), required=False, allow_null=True
     )
+    image = HeaderImageField(required=False, allow_null=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         fields = (
@@ -17,14 +32,39 @@ class PostSerializer(serializers.ModelSerializer):
             "group",
             "id",
             "image",
+            "image_width",
+            "image_height",
             "text",
             "pub_date",
+            "comments_count",
+            "image_variants",
+        )
+        read_only_fields = (
+            "id", "author", "comments_count", "image_width", "image_height"
         )
-        read_only_fields = ("id", "author")
         model = Post
 
+    def validate(self, attrs):
+        if "image" in attrs:
+            image = attrs["image"]
+            attrs["image_width"], attrs["image_height"] = (
+                image.image_size if image else (None, None)
+            )
+        return attrs
 
-class CommentSerializer(serializers.ModelSerializer):
+    def get_image_variants(self, obj):
+        """Ссылки на уменьшенные копии; пусто, пока они не готовы."""
+        request = self.context.get("request")
+        urls = variant_urls(obj)
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username"
@@ -36,7 +76,7 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = (
@@ -56,3 +96,61 @@ class FollowSerializer(serializers.ModelSerializer):
         model = Follow
         fields = ("user", "following")
         read_only_fields = ("id", "user", "following")
+
+
+class FollowBulkSerializer(serializers.Serializer):
+    following = serializers.ListField(
+        child=serializers.CharField(max_length=150),
+        allow_empty=False,
+        max_length=5000,
+    )
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=("GET", "POST", "PUT", "PATCH", "DELETE")
+    )
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+
+
+class ProfileSerializer(serializers.ModelSerializer):
+    followers_count = serializers.SerializerMethodField()
+    following_count = serializers.SerializerMethodField()
+    is_following = serializers.SerializerMethodField()
+    follows_you = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = (
+            "id",
+            "username",
+            "followers_count",
+            "following_count",
+            "is_following",
+            "follows_you",
+        )
+
+    def get_viewer_id(self):
+        request = self.context.get("request")
+        if request is None or not request.user.is_authenticated:
+            return None
+        return request.user.id
+
+    def get_followers_count(self, obj):
+        return get_follow_graph().followers_count(obj.id)
+
+    def get_following_count(self, obj):
+        return get_follow_graph().following_count(obj.id)
+
+    def get_is_following(self, obj):
+        viewer_id = self.get_viewer_id()
+        return viewer_id is not None and get_follow_graph().is_following(
+            viewer_id, obj.id
+        )
+
+    def get_follows_you(self, obj):
+        viewer_id = self.get_viewer_id()
+        return viewer_id is not None and get_follow_graph().is_following(
+            obj.id, viewer_id
+        )
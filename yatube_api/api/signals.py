@@ -0,0 +1,86 @@
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, User
+from .graph import record_follows, record_unfollows
+from .cache import (
+    GROUP_CACHE_PREFIX,
+    POST_CACHE_PREFIX,
+    POST_EXISTS_PREFIX,
+    forget_existence,
+    invalidate_objects,
+)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    invalidate_objects(POST_CACHE_PREFIX, (instance.pk,))
+
+
+@receiver(post_delete, sender=Post)
+def forget_post(sender, instance, **kwargs):
+    forget_existence(POST_EXISTS_PREFIX, (instance.pk,))
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_posts(sender, instance, **kwargs):
+    # SET_NULL обнуляет group у постов запросом UPDATE без сигналов.
+    instance._post_ids = list(
+        instance.posts.values_list("id", flat=True)
+    )
+
+
+@receiver((post_save, post_delete), sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    post_ids = getattr(instance, "_post_ids", ())
+    invalidate_objects(GROUP_CACHE_PREFIX, (instance.pk,))
+    invalidate_objects(POST_CACHE_PREFIX, post_ids)
+    if post_ids:
+        Post.objects.filter(id__in=post_ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=User)
+def remember_username_change(sender, instance, update_fields=None,
+                             **kwargs):
+    instance._username_changed = False
+    if instance.pk is None:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    old_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("username", flat=True)
+        .first()
+    )
+    instance._username_changed = old_username != instance.username
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_posts(sender, instance, **kwargs):
+    if not getattr(instance, "_username_changed", False):
+        return
+    invalidate_objects(
+        POST_CACHE_PREFIX, instance.posts.values_list("id", flat=True)
+    )
+    # Имя автора входит в ответы, поэтому ETag постов и комментариев
+    # должен смениться.
+    now = timezone.now()
+    Post.objects.filter(author=instance).update(updated_at=now)
+    Comment.objects.filter(author=instance).update(updated_at=now)
+
+
+@receiver(post_save, sender=Follow)
+def add_follow_edge(sender, instance, created, **kwargs):
+    if created:
+        record_follows(instance.user_id, (instance.following_id,))
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow_edge(sender, instance, **kwargs):
+    record_unfollows(instance.user_id, (instance.following_id,))
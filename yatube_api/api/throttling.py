@@ -1,12 +1,301 @@
 from rest_framework import throttling
 
 import datetime
+import os
+import sqlite3
+import threading
+import time
 
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.signals import request_finished
+from django.utils.module_loading import import_string
 
-class WorkingHoursRateThrottle(throttling.BaseThrottle):
+DEFAULT_THROTTLE_STORE = {"BACKEND": "api.throttling.CacheThrottleStore"}
+DEFAULT_ADAPTIVE_THROTTLE = {
+    "TARGET_LATENCY": 0.5,
+    "INITIAL_LIMIT": 32,
+    "MIN_LIMIT": 2,
+    "MAX_LIMIT": 256,
+    "RETRY_AFTER": 1,
+    "MAINTENANCE_WINDOW": None,
+}
+
+_throttle_store = None
+
+
+def maintenance_wait(window, now):
+    """Секунды до конца окна обслуживания или None вне окна.
+
+    Окно (начало, конец) — часы по времени сервера, конец не входит.
+    Если начало больше конца, окно переходит через полночь: (23, 2) —
+    с 23:00 до 02:00.
+    """
+    start, end = window
+    if (now.hour - start) % 24 >= (end - start) % 24:
+        return None
+    window_end = now.replace(
+        minute=0, second=0, microsecond=0
+    ) + datetime.timedelta(hours=(end - now.hour) % 24)
+    return (window_end - now).total_seconds()
+
+
+class ConcurrencyLimiter:
+    """Адаптивный предел одновременных запросов в процессе (AIMD).
+
+    Пока сглаженная задержка ответа не превышает target_latency, предел
+    растёт примерно на единицу за каждые limit запросов; при превышении
+    уменьшается на 10%.
+    """
+
+    smoothing = 0.2
+    decrease_factor = 0.9
+
+    def __init__(self, target_latency, initial_limit, min_limit, max_limit):
+        self.target_latency = target_latency
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency):
+        with self._lock:
+            self.in_flight -= 1
+            self.latency += self.smoothing * (latency - self.latency)
+            if self.latency > self.target_latency:
+                self.limit = max(
+                    self.min_limit, self.limit * self.decrease_factor
+                )
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class AdaptiveConcurrencyThrottle(throttling.BaseThrottle):
+    """Отклоняет запросы, только когда процесс перегружен.
+
+    Следит за числом выполняющихся запросов и их задержкой (см.
+    ConcurrencyLimiter). Запрос учитывается до сигнала request_finished.
+    Настройки — ADAPTIVE_THROTTLE; MAINTENANCE_WINDOW задаёт часы
+    (начало, конец) по времени сервера, когда запросы отклоняются
+    всегда (см. maintenance_wait).
+    """
+
+    limiter = None
+    _active = threading.local()
+
+    @classmethod
+    def get_config(cls):
+        return {
+            **DEFAULT_ADAPTIVE_THROTTLE,
+            **getattr(settings, "ADAPTIVE_THROTTLE", {}),
+        }
+
+    @classmethod
+    def get_limiter(cls):
+        if cls.limiter is None:
+            config = cls.get_config()
+            cls.limiter = ConcurrencyLimiter(
+                target_latency=config["TARGET_LATENCY"],
+                initial_limit=config["INITIAL_LIMIT"],
+                min_limit=config["MIN_LIMIT"],
+                max_limit=config["MAX_LIMIT"],
+            )
+        return cls.limiter
 
     def allow_request(self, request, view):
-        now = datetime.datetime.now().hour
-        if 5 > now >= 3:
+        config = self.get_config()
+        self.wait_time = config["RETRY_AFTER"]
+        window = config["MAINTENANCE_WINDOW"]
+        if window is not None:
+            wait = maintenance_wait(window, datetime.datetime.now())
+            if wait is not None:
+                self.wait_time = wait
+                return False
+        if getattr(self._active, "started", None) is not None:
+            # Повторная проверка в рамках того же запроса.
+            return True
+        if not self.get_limiter().acquire():
             return False
+        self._active.started = time.monotonic()
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+    @classmethod
+    def request_finished(cls, **kwargs):
+        started = getattr(cls._active, "started", None)
+        if started is None:
+            return
+        cls._active.started = None
+        cls.get_limiter().release(time.monotonic() - started)
+
+
+request_finished.connect(AdaptiveConcurrencyThrottle.request_finished)
+
+
+def gcra(tat, now, interval, duration):
+    """Один шаг GCRA: (новый TAT, 0) или (старый TAT, время ожидания)."""
+    tat = max(tat if tat is not None else now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - duration
+    if now < allow_at:
+        return tat, allow_at - now
+    return new_tat, 0.0
+
+
+class CacheThrottleStore:
+    """Состояние в кэше Django: локально для процесса при LocMemCache."""
+
+    def __init__(self, cache=default_cache):
+        self.cache = cache
+
+    def acquire(self, key, now, interval, duration):
+        tat, wait = gcra(self.cache.get(key), now, interval, duration)
+        if not wait:
+            self.cache.set(key, tat, tat - now)
+        return wait
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class SQLiteThrottleStore:
+    """Состояние в файле SQLite (WAL), общем для всех процессов хоста.
+
+    Чтение и запись TAT выполняются в одной транзакции BEGIN IMMEDIATE,
+    поэтому лимит соблюдается точно при любом числе воркеров. Сетевых
+    обращений нет, просроченные ключи удаляются раз в
+    cleanup_interval вызовов.
+    """
+
+    cleanup_interval = 1000
+
+    def __init__(self, path, timeout=5.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._calls = 0
+
+    @property
+    def connection(self):
+        # Соединение нельзя разделять между потоками и унаследовать
+        # через fork.
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle ("
+                "key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def acquire(self, key, now, interval, duration):
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tat FROM throttle WHERE key = ?", (key,)
+            ).fetchone()
+            tat, wait = gcra(row and row[0], now, interval, duration)
+            if not wait:
+                connection.execute(
+                    "INSERT INTO throttle (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tat = excluded.tat",
+                    (key, tat),
+                )
+            self._calls += 1
+            if self._calls % self.cleanup_interval == 0:
+                connection.execute(
+                    "DELETE FROM throttle WHERE tat < ?", (now,)
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return wait
+
+    def get(self, key):
+        row = self.connection.execute(
+            "SELECT tat FROM throttle WHERE key = ?", (key,)
+        ).fetchone()
+        return row and row[0]
+
+    def clear(self):
+        self.connection.execute("DELETE FROM throttle")
+
+
+def get_throttle_store():
+    """Хранилище из настройки THROTTLE_STORE, одно на процесс."""
+    global _throttle_store
+    if _throttle_store is None:
+        config = getattr(settings, "THROTTLE_STORE", DEFAULT_THROTTLE_STORE)
+        backend = import_string(config["BACKEND"])
+        _throttle_store = backend(**config.get("OPTIONS", {}))
+    return _throttle_store
+
+
+class GCRARateThrottle(throttling.SimpleRateThrottle):
+    """Ограничение частоты по алгоритму GCRA.
+
+    Вместо списка отметок времени всех запросов хранится одно число —
+    теоретическое время прибытия (TAT) следующего запроса. Формат rate
+    тот же, что у SimpleRateThrottle: до num_requests запросов подряд,
+    дальше по одному раз в duration / num_requests. Где хранится TAT,
+    задаёт настройка THROTTLE_STORE.
+    """
+
+    def get_store(self):
+        return get_throttle_store()
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.wait_time = self.get_store().acquire(
+            self.key, self.now, self.duration / self.num_requests,
+            self.duration,
+        )
+        if self.wait_time:
+            return self.throttle_failure()
         return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class GCRAAnonRateThrottle(throttling.AnonRateThrottle, GCRARateThrottle):
+    pass
+
+
+class GCRAUserRateThrottle(throttling.UserRateThrottle, GCRARateThrottle):
+    pass
+
+
+class GCRAScopedRateThrottle(
+    throttling.ScopedRateThrottle, GCRARateThrottle
+):
+    pass
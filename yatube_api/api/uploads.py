@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image, UnidentifiedImageError
+from rest_framework import exceptions, serializers, status
+
+DEFAULT_IMAGE_UPLOAD = {
+    "MAX_SIZE": 10 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,
+    "MAX_SIDE": 10000,
+    "FORMATS": ("JPEG", "PNG", "GIF", "WEBP"),
+}
+
+
+def get_upload_config():
+    return {
+        **DEFAULT_IMAGE_UPLOAD,
+        **getattr(settings, "IMAGE_UPLOAD", {}),
+    }
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Файл слишком большой."
+    default_code = "upload_too_large"
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Прерывает загрузку, как только файл превысил IMAGE_UPLOAD.MAX_SIZE.
+
+    Стоит первым в списке обработчиков: запрос с заведомо большим
+    Content-Length отклоняется до чтения тела, остальные — на первом
+    лишнем фрагменте, не дожидаясь конца файла.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = get_upload_config()["MAX_SIZE"]
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        # Запас на текстовые поля формы.
+        limit = self.max_size + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if content_length and content_length > limit:
+            raise UploadTooLarge
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            raise UploadTooLarge
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+class HeaderImageField(serializers.ImageField):
+    """ImageField, который проверяет только заголовок изображения.
+
+    Формат и размеры читаются без декодирования пикселей, поэтому
+    проверка не зависит от размера файла. Слишком большие по числу
+    пикселей изображения (decompression bomb) отклоняются до того, как
+    их откроет кто-то ещё. Размеры сохраняются в file.image_size.
+    """
+
+    default_error_messages = {
+        **serializers.ImageField.default_error_messages,
+        "format": "Формат {format} не поддерживается.",
+        "dimensions": (
+            "Изображение {width}x{height} больше допустимого размера."
+        ),
+    }
+
+    def to_internal_value(self, data):
+        file = serializers.FileField.to_internal_value(self, data)
+        config = get_upload_config()
+        try:
+            with Image.open(file) as image:
+                image_format = image.format
+                width, height = image.size
+        except (UnidentifiedImageError, Image.DecompressionBombError,
+                OSError, ValueError):
+            self.fail("invalid_image")
+        finally:
+            file.seek(0)
+
+        if image_format not in config["FORMATS"]:
+            self.fail("format", format=image_format)
+        if (
+            width * height > config["MAX_PIXELS"]
+            or max(width, height) > config["MAX_SIDE"]
+        ):
+            self.fail("dimensions", width=width, height=height)
+        file.image_size = (width, height)
+        return file
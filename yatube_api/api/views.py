@@ -1,19 +1,67 @@
-from rest_framework import viewsets, permissions, mixins, status, filters
-from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.throttling import ScopedRateThrottle
-from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, permissions, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.http import Http404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 
-from posts.models import Post, Comment, Group, Follow, User
+from posts.feed import (
+    fan_out_post,
+    get_feed_queryset,
+    rebuild_timeline,
+    remove_from_timeline,
+)
+from posts.changes import get_changes, get_watermark, record_changes
+from posts.comments import latest_comments
+from posts.images import schedule_variants
+from posts.models import Change, Post, Comment, Group, Follow, User
+from .cache import (
+    GROUP_CACHE_PREFIX,
+    POST_CACHE_PREFIX,
+    POST_EXISTS_PREFIX,
+    invalidate_objects,
+    object_exists,
+)
+from .filters import PostSearchFilter, UsernameSearchFilter
+from .graph import get_follow_graph, record_follows
+from .mixins import (
+    CachedObjectMixin,
+    ConditionalGetMixin,
+    ValuesReadMixin,
+)
+from .pagination import (
+    CommentPagination,
+    FeedPagination,
+    GroupPagination,
+    PostPagination,
+)
 from .permissions import OwnerOrReadOnly
+from .readers import (
+    CommentValuesSerializer,
+    GroupValuesSerializer,
+    PostValuesSerializer,
+)
 from .serializers import (
     PostSerializer,
     CommentSerializer,
     GroupSerializer,
+    FollowBulkSerializer,
     FollowSerializer,
+    ProfileSerializer,
 )
-from .throttling import WorkingHoursRateThrottle
+from .throttling import AdaptiveConcurrencyThrottle, GCRAScopedRateThrottle
+from .uploads import MaxSizeUploadHandler
+
+
+DEFAULT_COMMENTS_LIMIT = 3
+MAX_COMMENTS_LIMIT = 20
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
 
 
 class CreateQueryViewSet(
@@ -22,87 +70,407 @@ class CreateQueryViewSet(
     pass
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+def change_comments_count(post_id, delta):
+    """Изменить Post.comments_count без гонок между запросами.
+
+    UPDATE не вызывает сигналов, поэтому кэш поста сбрасывается здесь,
+    а updated_at обновляется ради ETag. Вызывается в транзакции вместе
+    с изменением комментария.
+    """
+    Post.objects.filter(pk=post_id).update(
+        # Счётчик мог разойтись с данными (см. reconcile_comments_count).
+        comments_count=Greatest(F("comments_count") + delta, 0),
+        updated_at=timezone.now(),
+    )
+    invalidate_objects(POST_CACHE_PREFIX, (post_id,))
+    record_changes(Change.POST, (post_id,), Change.UPDATED)
+
+
+class PostViewSet(
+    ConditionalGetMixin, CachedObjectMixin, viewsets.ModelViewSet
+):
+    queryset = Post.objects.select_related("author").order_by("id")
     serializer_class = PostSerializer
+    values_serializer_class = PostValuesSerializer
     # permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
-    throttle_classes = (WorkingHoursRateThrottle, ScopedRateThrottle)
-    pagination_class = LimitOffsetPagination
+    throttle_classes = (AdaptiveConcurrencyThrottle, GCRAScopedRateThrottle)
+    pagination_class = PostPagination
     permission_classes = (OwnerOrReadOnly,)
+    filter_backends = (PostSearchFilter,)
+    object_cache_prefix = POST_CACHE_PREFIX
+    # pub_date нужен курсорной пагинации, updated_at — валидаторам
+    # страницы (ConditionalGetMixin).
+    list_only_fields = ("id", "pub_date", "updated_at")
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers.insert(0, MaxSizeUploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            post = serializer.save(author=self.request.user)
+            record_changes(Change.POST, (post.id,), Change.CREATED)
+        fan_out_post(post)
+        schedule_variants(post)
+
+    def perform_update(self, serializer):
+        image_changed = "image" in serializer.validated_data
+        with transaction.atomic():
+            if image_changed:
+                # Копии старого изображения больше не подходят.
+                post = serializer.save(image_variants={})
+            else:
+                post = serializer.save()
+            record_changes(Change.POST, (post.id,), Change.UPDATED)
+        if image_changed:
+            schedule_variants(post)
+
+    def perform_destroy(self, instance):
+        post_id = instance.id
+        with transaction.atomic():
+            comment_ids = list(
+                instance.comments.values_list("id", flat=True)
+            )
+            instance.delete()
+            record_changes(Change.COMMENT, comment_ids, Change.DELETED)
+            record_changes(Change.POST, (post_id,), Change.DELETED)
+
+    def get_comments_limit(self):
+        """Сколько последних комментариев встроить в каждый пост.
+
+        ?expand=comments&comments_limit=N, None — не встраивать.
+        """
+        params = self.request.query_params
+        expand = {
+            name.strip() for name in params.get("expand", "").split(",")
+            if name.strip()
+        }
+        if not expand or self.action not in ("list", "retrieve"):
+            return None
+        if expand != {"comments"}:
+            raise ValidationError({"expand": "Можно встроить только comments"})
+        fields = self.get_requested_fields()
+        if fields is not None and "id" not in fields:
+            raise ValidationError({"fields": "Для expand нужно поле id"})
+        try:
+            limit = int(params.get("comments_limit", DEFAULT_COMMENTS_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_COMMENTS_LIMIT:
+            raise ValidationError({"comments_limit": (
+                f"Укажите число от 1 до {MAX_COMMENTS_LIMIT}"
+            )})
+        return limit
+
+    def get_related_validator_querysets(self, pks):
+        if self.get_comments_limit() is None:
+            return ()
+        return (Comment.objects.filter(post__in=pks),)
+
+    def expand_comments(self, response):
+        limit = self.get_comments_limit()
+        if limit is None or response.status_code != status.HTTP_200_OK:
+            return response
+        data = response.data
+        paginated = isinstance(data, dict) and "results" in data
+        if paginated:
+            posts = data["results"]
+        elif isinstance(data, list):
+            posts = data
+        else:
+            posts = [data]
+
+        comments = latest_comments((post["id"] for post in posts), limit)
+        reader = CommentValuesSerializer(
+            context=self.get_serializer_context()
+        )
+        # Данные постов могут лежать в кэше, поэтому копируются.
+        posts = [
+            {**post, "comments": [
+                reader.to_representation({
+                    "id": comment.id,
+                    "author__username": comment.author_username,
+                    "post": comment.post_id,
+                    "text": comment.text,
+                    "created": comment.created,
+                })
+                for comment in comments[post["id"]]
+            ]}
+            for post in posts
+        ]
+        if paginated:
+            response.data = {**data, "results": posts}
+        elif isinstance(data, list):
+            response.data = posts
+        else:
+            response.data = posts[0]
+        return response
 
+    def list(self, request, *args, **kwargs):
+        return self.expand_comments(super().list(request, *args, **kwargs))
 
-class CommentsViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        return self.expand_comments(
+            super().retrieve(request, *args, **kwargs)
+        )
+
+
+class CommentsViewSet(
+    ConditionalGetMixin, ValuesReadMixin, viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
-    # pagination_class = CommentPagination
+    values_serializer_class = CommentValuesSerializer
+    # created нужен курсорной пагинации, updated_at — валидаторам
+    # страницы (ConditionalGetMixin).
+    list_only_fields = ("id", "created", "updated_at")
+    pagination_class = CommentPagination
     permission_classes = (OwnerOrReadOnly,)
 
+    def get_post_id(self):
+        """id поста из URL, проверенный один раз за запрос.
+
+        Чтение доверяет кэшу существования постов, запись всегда
+        проверяет пост в БД.
+        """
+        if getattr(self, "_post_id", None) is None:
+            post_id = int(self.kwargs["post_id"])
+            if self.request.method in permissions.SAFE_METHODS:
+                exists = object_exists(
+                    POST_EXISTS_PREFIX, post_id, Post.objects.all()
+                )
+            else:
+                exists = Post.objects.filter(pk=post_id).exists()
+            if not exists:
+                raise Http404
+            self._post_id = post_id
+        return self._post_id
+
     def get_queryset(self):
-        return Comment.objects.filter(post_id=self.kwargs.get("post_id"))
+        return Comment.objects.filter(
+            post_id=self.get_post_id()
+        ).select_related("author")
 
     def perform_create(self, serializer):
-        post = get_object_or_404(Post, id=self.kwargs.get("post_id"))
-        serializer.save(author=self.request.user, post=post)
+        post_id = self.get_post_id()
+        with transaction.atomic():
+            comment = serializer.save(
+                author=self.request.user, post_id=post_id
+            )
+            record_changes(Change.COMMENT, (comment.id,), Change.CREATED)
+            change_comments_count(post_id, 1)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            comment = serializer.save()
+            record_changes(Change.COMMENT, (comment.id,), Change.UPDATED)
+
+    def perform_destroy(self, instance):
+        comment_id = instance.id
+        with transaction.atomic():
+            instance.delete()
+            record_changes(Change.COMMENT, (comment_id,), Change.DELETED)
+            change_comments_count(instance.post_id, -1)
 
     def initial(self, request, *args, **kwargs):
         super().initial(request, *args, **kwargs)
-        if "post_id" in kwargs:
-            get_object_or_404(Post, id=kwargs["post_id"])
+        self.get_post_id()
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Group.objects.all()
+class GroupViewSet(
+    ConditionalGetMixin, CachedObjectMixin, viewsets.ReadOnlyModelViewSet
+):
+    queryset = Group.objects.order_by("id")
     serializer_class = GroupSerializer
-    # pagination_class = PageNumberPagination
+    values_serializer_class = GroupValuesSerializer
+    pagination_class = GroupPagination
     permission_classes = (permissions.AllowAny,)
+    object_cache_prefix = GROUP_CACHE_PREFIX
+    list_only_fields = ("id", "updated_at")
 
 
 class FollowViewSet(CreateQueryViewSet):
     serializer_class = FollowSerializer
     permission_classes = (permissions.IsAuthenticated,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, UsernameSearchFilter)
     search_fields = ("following__username",)
 
     def get_queryset(self):
-        return Follow.objects.filter(user=self.request.user)
+        return Follow.objects.filter(
+            user=self.request.user
+        ).select_related("user", "following")
+
+    def get_serializer_class(self):
+        if self.action in ("bulk_follow", "bulk_unfollow"):
+            return FollowBulkSerializer
+        return super().get_serializer_class()
 
     def create(self, request, *args, **kwargs):
         """Создание новой подписки"""
         following_username = request.data.get("following")
-        if not following_username:
+        if not following_username or not isinstance(following_username, str):
             return Response(
                 {"error": "Не указан пользователь для подписки"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            following_user = User.objects.get(username=following_username)
-        except User.DoesNotExist:
-            return Response(
-                {"error": "Пользователь не найден"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        if request.user == following_user:
+        if following_username == request.user.username:
             return Response(
                 {"error": "Нельзя подписаться на самого себя"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if Follow.objects.filter(
-            user=request.user,
-            following=following_user
-        ).exists():
+        try:
+            with transaction.atomic():
+                follow = Follow.objects.follow_by_username(
+                    request.user, following_username
+                )
+                if follow is not None:
+                    record_changes(
+                        Change.FOLLOW, (follow.following_id,),
+                        Change.CREATED, user=request.user,
+                    )
+        except IntegrityError:
             return Response(
                 {"error": "Вы уже подписаны на этого пользователя"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if follow is None:
+            return Response(
+                {"error": "Пользователь не найден"},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
-        follow = Follow.objects.create(
-            user=request.user,
-            following=following_user
-        )
+        record_follows(request.user.id, (follow.following_id,))
+        rebuild_timeline(request.user, (follow.following_id,))
         serializer = self.get_serializer(follow)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_response(self, results):
+        return Response({
+            "results": [
+                {"following": username, "status": result}
+                for username, result in results.items()
+            ]
+        })
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_follow(self, request):
+        """Подписка на список пользователей, например при импорте."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            results, created_ids = Follow.objects.bulk_follow(
+                request.user, serializer.validated_data["following"]
+            )
+            record_changes(
+                Change.FOLLOW, created_ids, Change.CREATED, user=request.user
+            )
+        record_follows(request.user.id, created_ids)
+        rebuild_timeline(request.user, created_ids)
+        return self.bulk_response(results)
+
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_unfollow(self, request):
+        """Отписка от списка пользователей."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            results, deleted_ids = Follow.objects.bulk_unfollow(
+                request.user, serializer.validated_data["following"]
+            )
+            record_changes(
+                Change.FOLLOW, deleted_ids, Change.DELETED, user=request.user
+            )
+            remove_from_timeline(request.user, deleted_ids)
+        return self.bulk_response(results)
+
+
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Лента постов авторов, на которых подписан пользователь."""
+
+    serializer_class = PostSerializer
+    pagination_class = FeedPagination
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return get_feed_queryset(self.request.user)
+
+
+class ChangesViewSet(viewsets.GenericViewSet):
+    """Изменения постов, комментариев и подписок для синхронизации.
+
+    ?since=<водяной знак> возвращает записи журнала (posts.models.Change)
+    после него по возрастанию, next — знак для следующего запроса. Без
+    since возвращается только текущий знак: клиент берёт его до полной
+    загрузки списков. Подписки видны только их владельцу.
+    """
+
+    permission_classes = (permissions.AllowAny,)
+
+    def get_int_param(self, name, default, minimum, maximum=None):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = minimum - 1
+        if value < minimum or maximum is not None and value > maximum:
+            raise ValidationError({name: "Некорректное значение"})
+        return value
+
+    def list(self, request, *args, **kwargs):
+        if "since" not in request.query_params:
+            return Response(
+                {"changes": [], "next": get_watermark(), "has_more": False}
+            )
+        since = self.get_int_param("since", None, 0)
+        limit = self.get_int_param(
+            "limit", DEFAULT_CHANGES_LIMIT, 1, MAX_CHANGES_LIMIT
+        )
+        rows = list(get_changes(request.user, since, limit + 1))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        usernames = dict(User.objects.filter(id__in=[
+            row["object_id"] for row in rows if row["model"] == Change.FOLLOW
+        ]).values_list("id", "username"))
+
+        changes = []
+        for row in rows:
+            change = {
+                "model": row["model"],
+                "id": row["object_id"],
+                "action": row["action"],
+            }
+            if row["model"] == Change.FOLLOW:
+                # id — автор; имя нужно, т.к. подписки отдаются по именам.
+                change["following"] = usernames.get(row["object_id"])
+            changes.append(change)
+        return Response({
+            "changes": changes,
+            "next": rows[-1]["id"] if rows else since,
+            "has_more": has_more,
+        })
+
+
+class ProfileViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Профиль пользователя со счётчиками и флагами подписки."""
+
+    queryset = User.objects.all()
+    serializer_class = ProfileSerializer
+    pagination_class = LimitOffsetPagination
+    lookup_field = "username"
+    lookup_value_regex = r"[\w.@+-]+"
+
+    @action(detail=True)
+    def mutual(self, request, username=None):
+        """Пользователи, взаимно подписанные с владельцем профиля."""
+        user = self.get_object()
+        mutual_ids = get_follow_graph().mutual(user.id)
+        page = self.paginate_queryset(mutual_ids)
+        ids = page if page is not None else mutual_ids
+        users = User.objects.in_bulk(ids)
+        serializer = self.get_serializer(
+            [users[pk] for pk in ids if pk in users], many=True
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
@@ -1,12 +1,13 @@
 from django.contrib import admin
 from .models import Post, Comment, Group, Follow
+from .search import search_posts
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group", "image")
     list_display_links = ("pk", "text")
-    search_fields = ("text", "author__username", "group__title")
+    search_fields = ("author__username", "group__title")
     list_filter = ("pub_date", "author", "group")
     readonly_fields = ("pub_date",)
     fieldsets = (
@@ -17,6 +18,18 @@ class PostAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Текст ищется по полнотекстовому индексу, остальное — как было."""
+        results, use_distinct = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            matched = search_posts(
+                Post.objects.all(), search_term, ranked=False
+            )
+            results |= queryset.filter(id__in=matched.values("id"))
+        return results, use_distinct
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
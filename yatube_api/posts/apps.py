@@ -1,5 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_save,
+)
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from .blobs import (
+            count_image_references,
+            release_image,
+            remember_image,
+        )
+        from .models import Post
+        from .search import ensure_search_index
+
+        post_migrate.connect(ensure_search_index, sender=self)
+        pre_save.connect(remember_image, sender=Post)
+        post_save.connect(count_image_references, sender=Post)
+        post_delete.connect(release_image, sender=Post)
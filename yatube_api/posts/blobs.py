@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import MediaBlob, Post
+
+
+def acquire_blob(name, storage, content=None):
+    """Добавить ссылку на файл.
+
+    Хранилище могло не записать файл, потому что он уже был, а
+    release_blob — удалить его до этой ссылки. Удаление стирает файл до
+    своего коммита, поэтому после записи счётчика файл либо защищён
+    ссылкой, либо его уже нет, и он записывается заново из content.
+    """
+    MediaBlob.objects.bulk_create(
+        (MediaBlob(name=name),), ignore_conflicts=True
+    )
+    MediaBlob.objects.filter(name=name).update(refcount=F("refcount") + 1)
+    if content is not None and not storage.exists(name):
+        storage.write_file(name, content)
+
+
+def release_blob(name, storage, variant_names=()):
+    """Снять ссылку на файл; последний освободивший удаляет файл.
+
+    Файл и его уменьшенные копии удаляются после коммита и только если
+    за это время никто не сослался на них снова.
+    """
+    MediaBlob.objects.filter(name=name).update(
+        refcount=Greatest(F("refcount") - 1, 0)
+    )
+
+    def delete_unused():
+        # Файлы удаляются до коммита: acquire_blob, ждущий эту строку,
+        # увидит уже удалённый файл и запишет его снова.
+        with transaction.atomic():
+            deleted, _ = MediaBlob.objects.filter(
+                name=name, refcount=0
+            ).delete()
+            if deleted:
+                for file_name in (name, *variant_names):
+                    storage.delete(file_name)
+
+    transaction.on_commit(delete_unused)
+
+
+def remember_image(sender, instance, update_fields=None, **kwargs):
+    instance._old_image = None
+    instance._image_content = None
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if instance.image and not instance.image._committed:
+        # После сохранения поле хранит только имя, а содержимое нужно
+        # acquire_blob.
+        instance._image_content = instance.image.file
+    if instance.pk is None:
+        return
+    instance._old_image = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("image", "image_variants")
+        .first()
+    )
+
+
+def count_image_references(sender, instance, created, **kwargs):
+    old_image = getattr(instance, "_old_image", None)
+    if not created and old_image is None:
+        # Сохранение без поля image.
+        return
+    name = instance.image.name or ""
+    old_name, old_variants = old_image or ("", {})
+    if (old_name or "") == name:
+        return
+    content = getattr(instance, "_image_content", None)
+    instance._image_content = None
+    if name:
+        acquire_blob(name, instance.image.storage, content)
+    if old_name:
+        release_blob(
+            old_name, instance.image.storage, old_variants.values()
+        )
+
+
+def release_image(sender, instance, **kwargs):
+    if instance.image:
+        release_blob(
+            instance.image.name,
+            instance.image.storage,
+            (instance.image_variants or {}).values(),
+        )
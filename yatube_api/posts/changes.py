@@ -0,0 +1,29 @@
+from .models import Change
+
+
+def record_changes(model, object_ids, action, user=None):
+    """Записать изменения объектов в журнал (см. Change).
+
+    Вызывается внутри транзакции, которая меняет сами объекты, чтобы
+    журнал не расходился с данными.
+    """
+    Change.objects.bulk_create(
+        Change(model=model, object_id=object_id, action=action, user=user)
+        for object_id in dict.fromkeys(object_ids)
+    )
+
+
+def get_changes(user, since, limit):
+    """Изменения с id > since, видимые пользователю, в порядке id."""
+    changes = Change.objects.filter(id__gt=since, user__isnull=True)
+    if user.is_authenticated:
+        changes = changes | Change.objects.filter(id__gt=since, user=user)
+    return changes.order_by("id").values(
+        "id", "model", "object_id", "action"
+    )[:limit]
+
+
+def get_watermark():
+    return Change.objects.order_by("-id").values_list(
+        "id", flat=True
+    ).first() or 0
@@ -0,0 +1,29 @@
+from .models import Comment, User
+
+
+def latest_comments(post_ids, limit):
+    """Последние limit комментариев каждого поста одним запросом.
+
+    ROW_NUMBER() по post_id выбирает их в индексе (post, created, id).
+    Возвращает {post_id: [комментарий, ...]} в порядке создания; у
+    комментариев есть атрибут author_username.
+    """
+    post_ids = list(post_ids)
+    if not post_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(post_ids))
+    comments = Comment.objects.raw(
+        "SELECT c.id, c.post_id, c.text, c.created, "
+        "u.username AS author_username FROM ("
+        "SELECT id, author_id, post_id, text, created, ROW_NUMBER() OVER ("
+        "PARTITION BY post_id ORDER BY created DESC, id DESC) AS position "
+        f"FROM {Comment._meta.db_table} WHERE post_id IN ({placeholders})"
+        f") c JOIN {User._meta.db_table} u ON u.id = c.author_id "
+        "WHERE c.position <= %s "
+        "ORDER BY c.post_id, c.created, c.id",
+        [*post_ids, limit],
+    )
+    result = {post_id: [] for post_id in post_ids}
+    for comment in comments:
+        result[comment.post_id].append(comment)
+    return result
@@ -0,0 +1,150 @@
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import FeedItem, Follow, Post
+
+
+def fan_out_post(post):
+    """Разложить новый пост по лентам подписчиков автора.
+
+    Посты авторов, у которых больше FEED_FANOUT_LIMIT подписчиков, не
+    раскладываются: get_feed_queryset берёт их напрямую. Решение
+    сохраняется в Post.in_feeds, и лента читает только его.
+    """
+    fanout_limit = getattr(settings, "FEED_FANOUT_LIMIT", 1000)
+    followers = Follow.objects.filter(following_id=post.author_id)
+    if followers[fanout_limit:fanout_limit + 1].exists():
+        return
+    with transaction.atomic():
+        # Отметка ставится до выборки подписчиков: подписавшийся позже
+        # получит пост через rebuild_timeline.
+        Post.objects.filter(pk=post.pk).update(in_feeds=True)
+        post.in_feeds = True
+        FeedItem.objects.bulk_create(
+            (
+                FeedItem(user_id=user_id, post=post, pub_date=post.pub_date)
+                for user_id in followers.values_list("user_id", flat=True)
+            ),
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        trim_timelines(
+            "SELECT user_id FROM {follow} WHERE following_id = %s",
+            [post.author_id],
+        )
+
+
+def rebuild_timeline(user, author_ids):
+    """Дозаполнить ленту пользователя постами новых подписок."""
+    max_length = getattr(settings, "FEED_MAX_LENGTH", 500)
+    posts = (
+        Post.objects.filter(author_id__in=author_ids, in_feeds=True)
+        .order_by("-pub_date", "-id")
+        .values_list("id", "pub_date")[:max_length]
+    )
+    FeedItem.objects.bulk_create(
+        (
+            FeedItem(user=user, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    trim_timelines("%s", [user.id])
+
+
+def remove_from_timeline(user, author_ids):
+    """Убрать из ленты пользователя посты авторов, от которых он отписался."""
+    FeedItem.objects.filter(
+        user=user, post__author_id__in=author_ids
+    ).delete()
+
+
+def trim_timelines(users_sql, params):
+    """Оставить в каждой ленте не более FEED_MAX_LENGTH последних записей.
+
+    users_sql — подзапрос, возвращающий id пользователей, чьи ленты
+    нужно обрезать; в нём доступны плейсхолдеры {follow} и {feed}.
+    Ранжируются только ленты длиннее FEED_MAX_LENGTH.
+    """
+    tables = {
+        "feed": FeedItem._meta.db_table,
+        "follow": Follow._meta.db_table,
+    }
+    sql = (
+        "DELETE FROM {feed} WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "   PARTITION BY user_id ORDER BY pub_date DESC, id DESC"
+        "  ) AS position"
+        "  FROM {feed} WHERE user_id IN ("
+        "   SELECT user_id FROM {feed}"
+        "   WHERE user_id IN (" + users_sql + ")"
+        "   GROUP BY user_id HAVING COUNT(*) > %s"
+        "  )"
+        " ) ranked WHERE position > %s"
+        ")"
+    ).format(**tables)
+    max_length = getattr(settings, "FEED_MAX_LENGTH", 500)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, max_length, max_length])
+
+
+class Timeline:
+    """Лента пользователя: слияние двух выборок, упорядоченных индексами.
+
+    Записи FeedItem читаются по feeditem_user_pub_date_idx, посты,
+    не разложенные по лентам, — по post_not_in_feeds_idx. Поддерживает
+    то, что нужно CursorPagination: order_by по (pub_date, id), filter
+    по pub_date и срез; из каждой выборки читается не больше конца
+    среза.
+    """
+
+    def __init__(self, user, descending=True, filters=None):
+        self.user = user
+        self.descending = descending
+        self.filters = filters or {}
+
+    def order_by(self, *ordering):
+        return Timeline(
+            self.user, ordering[0].startswith("-"), self.filters
+        )
+
+    def filter(self, **filters):
+        return Timeline(
+            self.user, self.descending, {**self.filters, **filters}
+        )
+
+    def __getitem__(self, key):
+        sign = "-" if self.descending else ""
+        feed_items = (
+            FeedItem.objects.filter(user=self.user, **self.filters)
+            .select_related("post__author")
+            .order_by(f"{sign}pub_date", f"{sign}post_id")[:key.stop]
+        )
+        direct_posts = (
+            Post.objects.filter(
+                in_feeds=False,
+                author_id__in=Follow.objects.filter(
+                    user=self.user
+                ).values("following_id"),
+                **self.filters,
+            )
+            .select_related("author")
+            .order_by(f"{sign}pub_date", f"{sign}id")[:key.stop]
+        )
+        posts = heapq.merge(
+            (item.post for item in feed_items),
+            direct_posts,
+            key=lambda post: (post.pub_date, post.id),
+            reverse=self.descending,
+        )
+        return list(islice(posts, key.start, key.stop))
+
+
+def get_feed_queryset(user):
+    """Посты из материализованной ленты плюс неразложенные посты авторов."""
+    return Timeline(user)
@@ -0,0 +1,107 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .changes import record_changes
+from .models import Change, Post
+from .thumbnails import render_variants
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMAGE_VARIANTS = {
+    "thumbnail": {"size": (320, 320), "format": "WEBP", "quality": 80},
+    "large": {"size": (1280, 1280), "format": "WEBP", "quality": 85},
+}
+
+_executor = None
+
+
+def get_image_variants():
+    return getattr(settings, "POST_IMAGE_VARIANTS", DEFAULT_IMAGE_VARIANTS)
+
+
+def get_executor():
+    """Пул процессов из POST_IMAGE_WORKERS; при 0 — обработка на месте."""
+    global _executor
+    workers = getattr(settings, "POST_IMAGE_WORKERS", 2)
+    if not workers:
+        return None
+    if _executor is None:
+        # fork из многопоточного сервера копирует чужие блокировки и
+        # соединения с БД.
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def save_variants(post_id, name, variants):
+    """Записать варианты, если у поста всё ещё то же изображение."""
+    post = Post.objects.filter(pk=post_id, image=name).first()
+    if post is None:
+        return
+    post.image_variants = variants
+    with transaction.atomic():
+        # save(), а не update(): сигналы сбрасывают кэш ответа с постом.
+        post.save(update_fields=("image_variants", "updated_at"))
+        record_changes(Change.POST, (post_id,), Change.UPDATED)
+
+
+def _on_rendered(post_id, name, future):
+    # Колбэк выполняется в служебном потоке пула, у которого своё
+    # соединение с БД.
+    try:
+        save_variants(post_id, name, future.result())
+    except Exception:
+        logger.exception("Не удалось обработать изображение %s", name)
+    finally:
+        connection.close()
+
+
+def schedule_variants(post):
+    """Поставить в очередь обработку изображения поста после коммита."""
+    if not post.image:
+        return
+    post_id, name = post.pk, post.image.name
+
+    def submit():
+        # Одинаковые файлы хранятся один раз (posts.storage), и копии
+        # у них тоже общие.
+        shared = (
+            Post.objects.filter(image=name)
+            .exclude(image_variants={})
+            .values_list("image_variants", flat=True)
+            .first()
+        )
+        if shared:
+            save_variants(post_id, name, shared)
+            return
+        executor = get_executor()
+        variants = get_image_variants()
+        if executor is None:
+            save_variants(
+                post_id, name,
+                render_variants(settings.MEDIA_ROOT, name, variants),
+            )
+            return
+        future = executor.submit(
+            render_variants, str(settings.MEDIA_ROOT), name, variants
+        )
+        future.add_done_callback(
+            lambda future: _on_rendered(post_id, name, future)
+        )
+
+    transaction.on_commit(submit)
+
+
+def variant_urls(post):
+    # Хранилище берётся у поля, чтобы не загружать отложенное image.
+    storage = Post._meta.get_field("image").storage
+    return {
+        variant: storage.url(name)
+        for variant, name in (post.image_variants or {}).items()
+    }
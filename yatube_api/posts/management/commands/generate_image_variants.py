@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.images import get_executor, get_image_variants, save_variants
+from posts.models import Post
+from posts.thumbnails import render_variants
+
+
+class Command(BaseCommand):
+    help = "Создаёт уменьшенные копии изображений уже опубликованных постов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Пересоздать копии и у постов, где они уже есть",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            posts = posts.filter(image_variants={})
+        jobs = list(posts.values_list("id", "image"))
+        root = str(settings.MEDIA_ROOT)
+        variants = get_image_variants()
+        executor = get_executor()
+        if executor is not None:
+            futures = [
+                executor.submit(render_variants, root, name, variants)
+                for _, name in jobs
+            ]
+
+        done = 0
+        for index, (post_id, name) in enumerate(jobs):
+            try:
+                if executor is None:
+                    result = render_variants(root, name, variants)
+                else:
+                    result = futures[index].result()
+            except Exception as error:
+                self.stderr.write(f"{name}: {error}")
+                continue
+            save_variants(post_id, name, result)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Обработано изображений: {done} из {len(jobs)}"
+        ))
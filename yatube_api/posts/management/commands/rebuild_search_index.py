@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import (
+    ensure_search_index,
+    fts_available,
+    rebuild_search_index,
+)
+
+
+class Command(BaseCommand):
+    help = "Перестраивает полнотекстовый индекс постов"
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                "Полнотекстовый индекс доступен только в SQLite"
+            )
+        ensure_search_index()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Индекс постов перестроен"))
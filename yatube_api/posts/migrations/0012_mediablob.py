@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:37
+
+from django.db import migrations, models
+from django.db.models import Count
+import posts.storage
+
+
+def count_references(apps, schema_editor):
+    MediaBlob = apps.get_model('posts', 'MediaBlob')
+    Post = apps.get_model('posts', 'Post')
+    counts = (
+        Post.objects.exclude(image='').exclude(image__isnull=True)
+        .order_by()
+        .values_list('image')
+        .annotate(count=Count('pk'))
+    )
+    MediaBlob.objects.bulk_create(
+        (MediaBlob(name=name, refcount=count) for name, count in counts),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='in_feeds',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Разложен по лентам'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('in_feeds', False)), fields=['author', '-pub_date', '-id'], name='post_not_in_feeds_idx'),
+        ),
+    ]
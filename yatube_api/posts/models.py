@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -21,6 +24,7 @@ class Group(models.Model):
         verbose_name="Описание группы",
         help_text="Подробное описание сообщества"
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
 
     def __str__(self):
         return self.title
@@ -38,7 +42,22 @@ class Post(models.Model):
         on_delete=models.CASCADE,
         related_name="posts"
     )
-    image = models.ImageField(upload_to="posts/", null=True, blank=True)
+    image = models.ImageField(
+        upload_to="posts/",
+        storage=ContentAddressedStorage(),
+        null=True,
+        blank=True,
+    )
+    # Заполняются при загрузке через API, чтобы не открывать файл ради
+    # размеров; у старых постов пустые.
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
+    # Уменьшенные копии image: {вариант: имя файла}, см. posts.images.
+    image_variants = models.JSONField(default=dict, editable=False)
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
@@ -47,11 +66,82 @@ class Post(models.Model):
         related_name="posts",
         verbose_name="Сообщество",
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    # Денормализованный счётчик: меняется через F() при создании и
+    # удалении комментария в API, расхождения исправляет команда
+    # reconcile_comments_count.
+    comments_count = models.PositiveIntegerField(
+        "Число комментариев", default=0, editable=False
+    )
+    # Разложен ли пост по лентам подписчиков (posts.feed.fan_out_post).
+    # Решение принимается один раз при публикации; остальные посты лента
+    # берёт напрямую по подпискам.
+    in_feeds = models.BooleanField(
+        "Разложен по лентам", default=False, editable=False
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("-pub_date", "-id"), name="post_pub_date_id_idx"
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_not_in_feeds_idx",
+                condition=models.Q(in_feeds=False),
+            ),
+        )
 
     def __str__(self):
         return self.text
 
 
+class MediaBlob(models.Model):
+    """Счётчик постов, ссылающихся на файл изображения (posts.blobs)."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+class FullTextField(models.TextField):
+    """Колонка полнотекстового индекса с поиском через __match."""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class PostSearchIndex(models.Model):
+    """Виртуальная таблица FTS5 над Post.text (только SQLite).
+
+    Таблица и триггеры синхронизации создаются в posts.search,
+    rank — встроенная колонка FTS5 со значением bm25.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_index",
+    )
+    text = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "posts_post_fts"
+
+
 class Comment(models.Model):
     author = models.ForeignKey(
         User,
@@ -69,11 +159,116 @@ class Comment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("post", "created", "id"),
+                name="comment_post_created_id_idx",
+            ),
+        )
 
     def __str__(self):
         return self.text
 
 
+class FollowManager(models.Manager):
+
+    def follow_by_username(self, user, username):
+        """Подписать user на автора по имени одним INSERT ... SELECT.
+
+        Возвращает подписку или None, если автора с таким именем нет.
+        Повторная подписка нарушает unique_together и поднимает
+        IntegrityError.
+        """
+        connection = connections[self.db]
+        created_at = timezone.now()
+        sql = (
+            f"INSERT INTO {self.model._meta.db_table} "
+            "(user_id, following_id, created_at) "
+            f"SELECT %s, id, %s FROM {User._meta.db_table} "
+            "WHERE username = %s "
+            "RETURNING id, following_id"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                user.pk,
+                connection.ops.adapt_datetimefield_value(created_at),
+                username,
+            ])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        follow_id, following_id = row
+        return self.model(
+            id=follow_id,
+            user=user,
+            following=User(id=following_id, username=username),
+            created_at=created_at,
+        )
+
+    def bulk_follow(self, user, usernames, batch_size=500):
+        """Подписать user на авторов из списка имён.
+
+        Возвращает статус для каждого имени: created, already_following,
+        not_found или self.
+        """
+        user_ids = dict(
+            User.objects.filter(username__in=set(usernames))
+            .values_list("username", "id")
+        )
+        already = set(
+            self.filter(user=user, following_id__in=user_ids.values())
+            .values_list("following_id", flat=True)
+        )
+        results = {}
+        new_ids = []
+        for username in usernames:
+            if username in results:
+                continue
+            following_id = user_ids.get(username)
+            if following_id is None:
+                results[username] = "not_found"
+            elif following_id == user.pk:
+                results[username] = "self"
+            elif following_id in already:
+                results[username] = "already_following"
+            else:
+                results[username] = "created"
+                new_ids.append(following_id)
+        self.bulk_create(
+            (self.model(user=user, following_id=pk) for pk in new_ids),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        return results, new_ids
+
+    def bulk_unfollow(self, user, usernames):
+        """Отписать user от авторов из списка имён.
+
+        Возвращает статус для каждого имени: deleted, not_following
+        или not_found.
+        """
+        user_ids = dict(
+            User.objects.filter(username__in=set(usernames))
+            .values_list("username", "id")
+        )
+        follows = self.filter(user=user, following_id__in=user_ids.values())
+        followed = set(follows.values_list("following_id", flat=True))
+        follows.delete()
+        results = {}
+        for username in usernames:
+            following_id = user_ids.get(username)
+            if following_id is None:
+                results[username] = "not_found"
+            elif following_id in followed:
+                results[username] = "deleted"
+            else:
+                results[username] = "not_following"
+        return results, list(followed)
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         User,
@@ -85,6 +280,8 @@ class Follow(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = FollowManager()
+
     class Meta:
         unique_together = ("user", "following")
         verbose_name = "Подписка"
@@ -92,3 +289,78 @@ class Follow(models.Model):
 
     def __str__(self):
         return f"{self.user} подписан на {self.following}"
+
+
+class FeedItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="feed_items"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="feed_items"
+    )
+    pub_date = models.DateTimeField("Дата публикации")
+
+    class Meta:
+        unique_together = ("user", "post")
+        indexes = (
+            models.Index(
+                fields=("user", "-pub_date", "-id"),
+                name="feeditem_user_pub_date_idx"
+            ),
+        )
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+
+    def __str__(self):
+        return f"{self.post_id} в ленте {self.user}"
+
+
+class Change(models.Model):
+    """Запись журнала изменений для синхронизации клиентов (/changes/).
+
+    id служит водяным знаком. Запись делается в той же транзакции, что
+    и само изменение; для удалённых объектов остаётся запись deleted.
+    user задаёт, кому видна запись: None — всем, иначе только ему
+    (подписки). Для подписок object_id — id автора.
+    """
+
+    POST = "post"
+    COMMENT = "comment"
+    FOLLOW = "follow"
+    MODELS = (
+        (POST, "Пост"),
+        (COMMENT, "Комментарий"),
+        (FOLLOW, "Подписка"),
+    )
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTIONS = (
+        (CREATED, "Создан"),
+        (UPDATED, "Изменён"),
+        (DELETED, "Удалён"),
+    )
+
+    model = models.CharField(max_length=16, choices=MODELS)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=16, choices=ACTIONS)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Изменение"
+        verbose_name_plural = "Изменения"
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
@@ -0,0 +1,91 @@
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Value
+
+from .models import Post, PostSearchIndex
+
+FTS_TABLE = PostSearchIndex._meta.db_table
+POST_TABLE = Post._meta.db_table
+# FTS5 не принимает управляющие символы (NUL обрывает строку запроса).
+CONTROL_CHARACTERS = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+CREATE_INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='{POST_TABLE}', content_rowid='id')"
+)
+CREATE_TRIGGERS_SQL = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {POST_TABLE}"
+    f" BEGIN INSERT INTO {FTS_TABLE}(rowid, text)"
+    f" VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {POST_TABLE}"
+    f" BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)"
+    f" VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au"
+    f" AFTER UPDATE OF text ON {POST_TABLE}"
+    f" BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)"
+    f" VALUES ('delete', old.id, old.text);"
+    f" INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def match_expression(query):
+    """Экранировать пользовательский ввод для синтаксиса MATCH.
+
+    Каждое слово становится фразой в кавычках, слова объединяются
+    через неявный AND. Управляющие символы считаются пробелами.
+    """
+    query = CONTROL_CHARACTERS.sub(" ", query)
+    terms = (term.replace('"', '""') for term in query.split())
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search_posts(queryset, query, ranked=True):
+    """Отфильтровать посты по тексту, при ranked — с аннотацией bm25.
+
+    Чем меньше search_rank, тем релевантнее пост.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset
+    if not fts_available():
+        queryset = queryset.filter(text__icontains=query)
+        rank = Value(0.0, output_field=FloatField())
+    else:
+        queryset = queryset.filter(search_index__text__match=expression)
+        rank = F("search_index__rank")
+    if ranked:
+        queryset = queryset.annotate(search_rank=rank)
+    return queryset
+
+
+def ensure_search_index(**kwargs):
+    """Создать индекс и триггеры, если их нет (обработчик post_migrate).
+
+    SQLite пересоздаёт таблицу постов при части миграций, при этом
+    триггеры теряются, поэтому проверка выполняется после каждой
+    миграции.
+    """
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        created = FTS_TABLE not in connection.introspection.table_names(
+            cursor
+        )
+        cursor.execute(CREATE_INDEX_SQL)
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+    if created:
+        rebuild_search_index()
+
+
+def rebuild_search_index():
+    """Перестроить индекс целиком по содержимому таблицы постов."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
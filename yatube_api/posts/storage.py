@@ -0,0 +1,74 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+DIGEST_RE = re.compile(r"(^|/)[0-9a-f]{64}[._]")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый файл один раз под SHA-256 его содержимого.
+
+    Имя файла заменяется на posts/ab/<sha256><расширение>, каталог из
+    upload_to сохраняется. Повторная загрузка того же содержимого не
+    пишет ничего нового. Когда файл можно удалить, решает счётчик
+    ссылок в posts.blobs; он же дописывает файл, если тот был удалён
+    между проверкой здесь и взятием ссылки.
+    """
+
+    def digest(self, content):
+        sha256 = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    def get_available_name(self, name, max_length=None):
+        # Одинаковое имя означает одинаковое содержимое.
+        return name
+
+    def _save(self, name, content):
+        digest = self.digest(content)
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = posixpath.join(directory, digest[:2], digest + extension)
+        if not self.exists(name):
+            self.write_file(name, content)
+        return name
+
+    def write_file(self, name, content):
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Запись во временный файл и атомарная замена: одновременные
+        # загрузки одного файла не видят его недописанным.
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(full_path))
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    temp_file.write(chunk)
+            os.chmod(temp_path, self.file_permissions_mode or 0o644)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """django.views.static.serve с вечным кэшированием для имён-хешей.
+
+    Содержимое по такому адресу не меняется, поэтому клиенту и CDN
+    незачем его перепроверять.
+    """
+    response = serve(request, path, document_root, show_indexes)
+    if DIGEST_RE.search(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
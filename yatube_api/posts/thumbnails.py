@@ -0,0 +1,50 @@
+"""Обработка изображений в дочерних процессах.
+
+Модуль не импортирует Django, чтобы процессы пула запускались без
+настройки проекта при любом способе старта (fork или spawn).
+"""
+import os
+
+from PIL import Image, ImageOps
+
+VARIANTS_DIR = "variants"
+
+
+def variant_name(name, variant, image_format):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, VARIANTS_DIR, f"{stem}_{variant}.{image_format.lower()}"
+    )
+
+
+def render_variants(root, name, variants):
+    """Создать уменьшенные копии файла root/name.
+
+    Выполняется в дочернем процессе, поэтому работает только с путями
+    и не трогает ORM. Возвращает {вариант: имя файла относительно root}.
+    """
+    result = {}
+    with Image.open(os.path.join(root, name)) as original:
+        largest = max(
+            (options["size"] for options in variants.values()),
+            key=lambda size: size[0] * size[1],
+        )
+        # JPEG декодируется сразу в уменьшенном масштабе.
+        original.draft("RGB", largest)
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.mode else "RGB")
+        for variant, options in variants.items():
+            copy = image.copy()
+            copy.thumbnail(options["size"], Image.Resampling.LANCZOS)
+            target = variant_name(name, variant, options["format"])
+            os.makedirs(os.path.join(root, os.path.dirname(target)),
+                        exist_ok=True)
+            copy.save(
+                os.path.join(root, target),
+                options["format"],
+                quality=options.get("quality", 85),
+            )
+            result[variant] = target
+    return result
@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
 application = get_asgi_application()
+
+from api.graph import build_follow_graph  # noqa: E402
+
+build_follow_graph()
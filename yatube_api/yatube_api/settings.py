@@ -92,6 +92,20 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATICFILES_DIRS = ((BASE_DIR / "static/"),)
 
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Процессы для уменьшенных копий изображений постов (posts.images);
+# 0 — обрабатывать в потоке запроса.
+POST_IMAGE_WORKERS = 2
+
+# Ограничения загрузки изображений постов (api.uploads): размер файла,
+# число пикселей, длина стороны, допустимые форматы Pillow.
+IMAGE_UPLOAD = {
+    "MAX_SIZE": 10 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -99,9 +113,14 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
+        "api.throttling.GCRAUserRateThrottle",
+        "api.throttling.GCRAAnonRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "10000/day",
@@ -109,9 +128,55 @@ REST_FRAMEWORK = {
     },
 }
 
+# Состояние throttling, общее для всех воркеров на хосте.
+THROTTLE_STORE = {
+    "BACKEND": "api.throttling.SQLiteThrottleStore",
+    "OPTIONS": {"path": BASE_DIR / "throttle.sqlite3"},
+}
+
+# Адаптивное ограничение нагрузки для PostViewSet. Окно обслуживания
+# задаётся часами сервера, например (3, 5); (23, 2) — через полночь;
+# None — без окна.
+ADAPTIVE_THROTTLE = {
+    "TARGET_LATENCY": 0.5,
+    "RETRY_AFTER": 1,
+    "MAINTENANCE_WINDOW": None,
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=365),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Кэш сериализованных постов и групп. Кэш в памяти у каждого процесса
+# свой: запись сверяется с updated_at из БД, поэтому изменения из других
+# процессов видны сразу.
+API_OBJECT_CACHE = {
+    "BACKEND": "api.cache.LRUCache",
+    "OPTIONS": {"max_entries": 10000, "timeout": 300},
+}
+
+# Как часто граф подписок в памяти перечитывается из БД, чтобы увидеть
+# изменения из других процессов (секунды).
+FOLLOW_GRAPH_MAX_AGE = 300
+
+FEED_MAX_LENGTH = 500
+FEED_FANOUT_LIMIT = 1000
+
+# Предел для клиентов, отказавшихся от пагинации заголовком
+# X-Pagination: none.
+API_UNPAGINATED_MAX_RESULTS = 1000
+
+# Списки постов, комментариев и групп сериализуются из .values()
+# (api.readers) в обход ModelSerializer.
+API_FAST_READ_SERIALIZERS = True
+
+# Сколько секунд помнить, что пост существует (комментарии к нему).
+API_EXISTENCE_CACHE_TIMEOUT = 30
+
+# /api/v1/batch/: предел подзапросов в пакете и число потоков для
+# параллельных GET.
+API_BATCH_MAX_REQUESTS = 20
+API_BATCH_WORKERS = 4
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
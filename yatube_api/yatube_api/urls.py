@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import TemplateView
 from rest_framework import routers
 
-from api.views import PostViewSet, CommentsViewSet, GroupViewSet, FollowViewSet
+from api.batch import BatchView
+from api.views import (
+    ChangesViewSet,
+    CommentsViewSet,
+    FeedViewSet,
+    FollowViewSet,
+    GroupViewSet,
+    PostViewSet,
+    ProfileViewSet,
+)
+from posts.storage import serve_media
 
 router = routers.DefaultRouter()
 router.register(r"posts", PostViewSet)
@@ -12,9 +23,13 @@ router.register(
 )
 router.register(r"groups", GroupViewSet)
 router.register(r"follow", FollowViewSet, basename="follow")
+router.register(r"feed", FeedViewSet, basename="feed")
+router.register(r"profiles", ProfileViewSet, basename="profiles")
+router.register(r"changes", ChangesViewSet, basename="changes")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/v1/batch/", BatchView.as_view(), name="batch"),
     path("api/v1/", include(router.urls)),
     path(
         "redoc/",
@@ -24,3 +39,10 @@ urlpatterns = [
     path("api/v1/", include("djoser.urls")),
     path("api/v1/", include("djoser.urls.jwt")),
 ]
+
+if settings.DEBUG:
+    urlpatterns.append(re_path(
+        r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"),
+        serve_media,
+        {"document_root": settings.MEDIA_ROOT},
+    ))